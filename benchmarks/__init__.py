@@ -0,0 +1,6 @@
+"""
+Micro-benchmarks for the hot paths of the game (quadtree, rectangle collision, physics and the entity manager).
+
+Run with 'python -m benchmarks' from the repository root. Results are written as JSON, so that two runs
+(e.g. before and after a change to utilities/quadtree.py) can be compared with '--compare'.
+"""
@@ -0,0 +1,69 @@
+# Standard
+import sys
+import json
+import time
+import argparse
+import platform
+
+# 3rd party
+import pygame
+
+# Local
+from benchmarks.cases import CASES, SIZES
+from benchmarks.timer import measure
+
+"""
+Runs the benchmark cases and writes the results as JSON. With '--compare', each result is also
+printed next to the matching result of an earlier run.
+
+    python -m benchmarks --output after.json --compare before.json
+"""
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Times the hot paths of the game.')
+    parser.add_argument('--output', '-o', help='file to write the JSON results to (default: stdout)')
+    parser.add_argument('--compare', '-c', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--filter', '-k', default='', help='only run cases whose name contains this text')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help='entity and tile counts to run')
+    parser.add_argument('--repeat', type=int, default=5, help='timed rounds per case')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+
+    results = {}
+    for name, case in CASES.items():
+        if args.filter.lower() not in name.lower():
+            continue
+
+        for size in args.sizes:
+            key = f'{name} [{size}]'
+            result = measure(case(size), args.repeat)
+            result['size'] = size
+            results[key] = result
+
+            line = f'{key:<56} {result["median"] * 1000:>12.4f} ms'
+            if (previous := baseline.get(key)):
+                line += f'   {result["median"] / previous["median"]:>6.2f}x vs baseline'
+            print(line, file=sys.stderr)
+
+    report = {
+        'meta' : {
+            'timestamp' : time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python' : platform.python_version(),
+            'pygame' : pygame.version.ver,
+            'platform' : platform.platform(),
+            'repeat' : args.repeat,
+        },
+        'results' : results
+    }
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+if __name__ == '__main__':
+    main()
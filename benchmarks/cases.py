@@ -0,0 +1,217 @@
+# Standard
+import os
+import json
+import atexit
+import random
+import shutil
+import tempfile
+
+# 3rd party
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+
+# Local
+from utilities.shapes import Rectangle
+from utilities.quadtree import QuadTree
+from utilities.grid import TileGrid
+from utilities.level import LevelFile, read_csv, compile_level, COMPILED_NAME
+from utilities.particles import Particles
+from utilities.projectiles import Projectiles
+from utilities.physics import integrate_all
+from tests.conftest import TILE_SIZE, ROW_LENGTH, ROW_SPACING, tiles, grid, level
+
+"""
+Benchmark cases. Every case is a function that takes the size of the problem and returns a callable
+that performs one operation. Levels are generated synthetically (and seeded), so results do not depend
+on the contents of the world folder; they are built the same way as the levels of the tests (see tests/conftest.py).
+"""
+
+SIZES = (10, 100, 1000, 10000)
+
+pygame.init()
+pygame.display.set_mode((1, 1))
+
+
+def queries(amount, tiles, size=(16, 24)):
+    rng = random.Random(amount)
+    return [Rectangle((tile.x + rng.randint(-8, 8), tile.y - size[1] + rng.randint(0, 2)), size) for tile in rng.choices(tiles, k=256)]
+
+def level_directory(amount):
+    directory = tempfile.mkdtemp(prefix='benchmark_level_')
+    atexit.register(shutil.rmtree, directory, True)
+
+    rows = [[0] * ROW_LENGTH for _ in range((amount // ROW_LENGTH + 1) * ROW_SPACING + 1)]
+    for tile in tiles(amount):
+        rows[tile.y // TILE_SIZE[1]][tile.x // TILE_SIZE[0]] = 1
+
+    entities = [[0] * ROW_LENGTH for _ in rows]
+    entities[1][0] = 1
+
+    with open(os.path.join(directory, 'data.json'), 'w') as file:
+        json.dump({'x' : 0, 'y' : 0, 'width' : ROW_LENGTH * TILE_SIZE[0], 'height' : len(rows) * TILE_SIZE[1]}, file)
+    for name, grid_rows in (('TileGrid.csv', rows), ('EntityGrid.csv', entities)):
+        with open(os.path.join(directory, name), 'w') as file:
+            file.write('\n'.join(','.join(map(str, row)) + ',' for row in grid_rows))
+    with open(os.path.join(directory, COMPILED_NAME), 'wb') as file:
+        file.write(compile_level(directory, (1,)))
+
+    return directory
+
+
+def quadtree_build(amount):
+    level_tiles = tiles(amount)
+    return lambda: QuadTree(level_tiles)
+
+def quadtree_hit(amount):
+    level_tiles = tiles(amount)
+    quadtree = QuadTree(level_tiles)
+    rects = queries(amount, level_tiles)
+
+    def run():
+        for rect in rects:
+            quadtree.hit(rect)
+    return run
+
+def quadtree_query(amount):
+    level_tiles = tiles(amount)
+    quadtree = QuadTree(level_tiles)
+    rects = queries(amount, level_tiles)
+    result = []
+
+    def run():
+        for rect in rects:
+            result.clear()
+            quadtree.query(rect, result)
+    return run
+
+def tilegrid_hit(amount):
+    static = grid(amount)
+    rects = queries(amount, tiles(amount))
+
+    def run():
+        for rect in rects:
+            static.hit(rect)
+    return run
+
+def rectangle_collide_all(amount):
+    level_tiles = tiles(amount)
+    rect = queries(amount, level_tiles)[0]
+    return lambda: rect.collide_all(level_tiles)
+
+def physics_update_verlet(amount):
+    manager, _, _ = level(amount)
+    entities = manager.retrieve_entities()
+    dt = 1 / 60
+
+    # One frame: every entity runs 10 substeps
+    def run():
+        for entity in entities:
+            for _ in range(10):
+                entity.update_verlet(dt, (entity.dx, entity.dy))
+            entity.reset_velocity()
+    return run
+
+def physics_integrate_all(amount):
+    manager, _, _ = level(amount)
+    entities = manager.retrieve_entities()
+    dt = 1 / 60
+
+    # One frame: all entities run their 10 substeps together
+    def run():
+        integrate_all(entities, dt)
+        for entity in entities:
+            entity.reset_velocity()
+    return run
+
+def physics_check_collision(amount):
+    manager, static, _ = level(amount)
+    entities = manager.retrieve_entities()
+
+    def run():
+        for entity in entities:
+            entity.check_collision(static)
+    return run
+
+def manager_update(amount):
+    manager, static, stage = level(amount)
+    dt = 1 / 60
+    return lambda: manager.update(dt, static, stage)
+
+def load_csv_level(amount):
+    directory = level_directory(amount)
+
+    def run():
+        with open(os.path.join(directory, 'data.json')) as file:
+            data = json.load(file)
+        TileGrid(read_csv(os.path.join(directory, 'TileGrid.csv')), (data['x'], data['y']), TILE_SIZE, None, (1,))
+        read_csv(os.path.join(directory, 'EntityGrid.csv'))
+    return run
+
+def load_compiled_level(amount):
+    path = os.path.join(level_directory(amount), COMPILED_NAME)
+
+    def run():
+        level_file = LevelFile(path)
+        TileGrid.from_cells(level_file.tiles, level_file.columns, level_file.origin, TILE_SIZE, None, (1,), level_file.merged((1,)))
+        list(level_file.entity_cells())
+    return run
+
+def particles_update(amount):
+    static = grid(amount)
+    particles = Particles()
+    rng = random.Random(amount)
+
+    # Particles keep being thrown up from the platforms, so that there are always about 'amount' of them
+    def run():
+        missing = amount - particles.count
+        while missing > 0:
+            tile = static.tile(rng.randrange(len(static.cells)))
+            particles.emit((tile.x + 8, tile.y - 12), min(missing, 20))
+            missing -= 20
+        particles.update(1 / 60, static)
+    return run
+
+def projectiles_update(amount):
+    manager, static, stage = level(amount)
+    projectiles = Projectiles(capacity=amount)
+    rng = random.Random(amount)
+
+    # Bullets keep being fired across the platforms, so that there are always about 'amount' of them
+    def run():
+        while projectiles.count < amount:
+            tile = static.tile(rng.randrange(len(static.cells)))
+            projectiles.fire((tile.x, tile.y - 12), (rng.choice((-180, 180)), 0))
+        projectiles.update(1 / 60, static, stage)
+    return run
+
+def broadphase_update(amount):
+    manager, _, _ = level(amount)
+    return lambda: manager.broadphase.update(manager.retrieve_entities())
+
+def manager_render(amount):
+    manager, static, stage = level(amount)
+    manager.update(1 / 60, static, stage)
+    screen = pygame.Surface((400, 225))
+    return lambda: manager.render(screen, (0, 0))
+
+
+"""
+All cases, by name. Levels have as many entities as tiles, so each size scales both.
+"""
+CASES = {
+    'QuadTree.__init__' : quadtree_build,
+    'QuadTree.hit (x256)' : quadtree_hit,
+    'QuadTree.query (x256)' : quadtree_query,
+    'TileGrid.hit (x256)' : tilegrid_hit,
+    'Rectangle.collide_all' : rectangle_collide_all,
+    'Physics.update_verlet (x10 per entity)' : physics_update_verlet,
+    'integrate_all (x10, all entities)' : physics_integrate_all,
+    'Physics.check_collision (per entity)' : physics_check_collision,
+    'EntityManager.update' : manager_update,
+    'EntityManager.render (400x225 view)' : manager_render,
+    'SweepAndPrune.update' : broadphase_update,
+    'Particles.update' : particles_update,
+    'Projectiles.update' : projectiles_update,
+    'Load level (CSV)' : load_csv_level,
+    'Load level (compiled)' : load_compiled_level,
+}
@@ -0,0 +1,29 @@
+# Standard
+import time
+import statistics
+
+"""
+Function measure(): Times 'function' and returns the seconds it takes per call. The function is first
+called once to estimate how many calls fit in 'min_time', then 'repeat' rounds of that many calls are timed.
+"""
+def measure(function, repeat=5, min_time=0.05):
+    start = time.perf_counter()
+    function()
+    single = time.perf_counter() - start
+
+    number = max(1, int(min_time / single)) if single > 0 else 1000
+
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        runs.append((time.perf_counter() - start) / number)
+
+    return {
+        'median' : statistics.median(runs),
+        'min' : min(runs),
+        'mean' : statistics.fmean(runs),
+        'number' : number,
+        'runs' : runs
+    }
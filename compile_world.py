@@ -0,0 +1,42 @@
+# Standard
+import os
+import argparse
+
+# Local
+from utilities.level import compile_level, COMPILED_NAME, SOURCE_NAMES, MERGED_TILES
+
+"""
+Compiles level directories (data.json, TileGrid.csv and EntityGrid.csv) into the binary files that LevelInfo loads
+instead of the CSV files (see utilities/level.py). Run it again after editing a level; a compiled file that is older
+than its sources is ignored.
+
+    python compile_world.py                         # every level in world/simplified
+    python compile_world.py world/simplified/Level_2
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description='Compiles level directories into binary level files.')
+    parser.add_argument('directories', nargs='*', help='level directories to compile (default: all of world/simplified)')
+    args = parser.parse_args()
+
+    directories = args.directories
+    if not directories:
+        root = os.path.join('world', 'simplified')
+        directories = sorted(os.path.join(root, name) for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)))
+
+    for directory in directories:
+        if not all(os.path.exists(os.path.join(directory, name)) for name in SOURCE_NAMES):
+            print(f'{directory}: skipped (not a level directory)')
+            continue
+
+        compiled = compile_level(directory, MERGED_TILES)
+
+        path = os.path.join(directory, COMPILED_NAME)
+        with open(path, 'wb') as file:
+            file.write(compiled)
+
+        source = sum(os.path.getsize(os.path.join(directory, name)) for name in SOURCE_NAMES)
+        print(f'{path}: {len(compiled)} bytes (sources {source} bytes)')
+
+if __name__ == '__main__':
+    main()
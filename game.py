@@ -1,5 +1,8 @@
 # Standard
+import os
+import time
 import random
+from queue import Queue
 
 # 3rd party
 import pygame
@@ -8,6 +11,11 @@ import pygame
 from utilities.menu import MainMenu, LoadMenu, PauseMenu
 from utilities.load import LevelInfo
 from utilities.camera import Camera
+from utilities.shapes import Rectangle
+from utilities.profiler import Profiler
+from utilities.backend import BACKENDS
+from utilities.hud import HUD
+from utilities.replay import Controls, Recorder, Replayer
 
 
 """
@@ -21,7 +29,17 @@ which means that it will update entities and objects (+ their physics), as well
 the screen - such as the background, foreground, enmemies, player, etc.
 """
 class Game:
-    def __init__(self):
+    # Settings, read when a game is made (set them on the class first, e.g. Game.PROFILE_EXPORT = 'profile.csv')
+    PROFILE_EXPORT = None # Path of a .csv or .json file to time every frame and save the timings to on exit
+    RENDER_BACKEND = 'surface' # How the screen is scaled up to the window: 'surface' (pygame.transform) or 'texture' (SDL's renderer)
+    RECORD_INPUT = False # Records the input of every level played into recordings/, to be replayed with replay.py
+
+    def __init__(self, headless=False):
+        # Headless mode runs levels without a window (SDL's dummy video driver) and without a frame cap
+        self.headless = headless
+        if self.headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
         pygame.init()
 
         # States
@@ -35,15 +53,15 @@ class Game:
         self.res_screen = DEFAULT_SCREEN_RESOLUTION
         self.res_offset = [self.res_window[n] / self.res_screen[n] for n in range(2)]
 
-        # Displays
-        self.window = pygame.display.set_mode(self.res_window)
+        # Displays (a headless game still needs a video mode for convert_alpha(), but never shows it)
+        self.backend = BACKENDS[self.RENDER_BACKEND](self.res_window, self.headless)
+        self.window = self.backend.surface # Menus are drawn at the resolution of the window
         self.screen = pygame.Surface(self.res_screen)
 
         # Title and Icon
-        pygame.display.set_caption('Below the Surface')
-
-        icon = pygame.image.load('images/icon/icon.png').convert_alpha()
-        pygame.display.set_icon(icon)
+        if not self.headless:
+            icon = pygame.image.load('images/icon/icon.png').convert_alpha()
+            self.backend.set_title('Below the Surface', icon)
 
         # Current level information
         self.LEVEL_INFO = LevelInfo()
@@ -52,12 +70,26 @@ class Game:
 
         # Time
         self.clock = pygame.time.Clock()
-        self.FRAMES_PER_SECOND = 60
+        self.FRAMES_PER_SECOND = 60 # Limits how often the screen is drawn (0 for no limit)
+        self.TICKS_PER_SECOND = 60 # How often the level is updated, independent of the frame rate
+        self.MAX_CATCH_UP = 5 # Most updates run in a single frame to catch up after a slow frame
+
+        # Profiling (F3 shows the time each phase of a frame takes)
+        self.profiler = Profiler()
+        self.profiler.enabled = self.PROFILE_EXPORT is not None
+        self.show_profiler = False
+
+        self.show_debug = False # F4 draws the rectangles of the entities (bodies and what they can see)
+
+        # Input
+        self.controls = Controls() # Input of the current update (keys, mouse buttons and mouse position)
+        self.session = Recorder() if self.RECORD_INPUT else None # Recorder or Replayer (see utilities/replay.py)
 
         # Camera
         self.camera = Camera(self.res_screen)
 
         self.offset = [0,0]
+        self.previous_offset = [0,0] # Offset before the latest update, to interpolate from
         self.target = None
 
         self.screen_shake = 0
@@ -71,36 +103,90 @@ class Game:
         self.death_screen = self.death_screen.convert_alpha()
         self.death_screen.fill((0,0,0,110))
 
+        self.hud = HUD(self) # Health, cursor, ...
+
         # Hide mouse cursor
         pygame.mouse.set_visible(False)
 
         self.button_cooldown = False
 
-        # Menus
+        # Menus (never shown in headless mode, so they are not built)
         self.MENU = {
-            'MAIN' : MainMenu(self),
-            'PAUSE' : PauseMenu(self),
+            'MAIN' : MainMenu(self) if not self.headless else None,
+            'PAUSE' : PauseMenu(self) if not self.headless else None,
             'SAVES' : None,
             'OPTIONS' : None,
-            'LOADING' : LoadMenu(self)
+            'LOADING' : LoadMenu(self) if not self.headless else None
         }
         
         self.current_menu = self.MENU['MAIN']
 
-    # A method within which is a loop that runs an instance of a level
+    # A method within which is a loop that runs an instance of a level.
+    # The level is updated at a fixed rate (TICKS_PER_SECOND) no matter how long a frame takes: the time of each frame is
+    # added up, and as many updates run as fit into it. What is left over is used to draw the level part of the way
+    # between the last two updates, so that movement stays smooth when drawing is faster or slower than updating.
     def level_sequence(self):
         self.button_cooldown = True
+
+        dt = 1 / self.TICKS_PER_SECOND
+        accumulator = 0
+        previous_time = time.perf_counter()
+
         while self.run_level_sequence:
-            self.update() # Updates physics and the logic of the level
-            self.render() # Draws (alt. updates) the visuals on the screen and window
+            self.profiler.begin_frame()
+            self.clock.tick(self.FRAMES_PER_SECOND) # Limits the FPS
+            self.profiler.lap('wait')
+
+            current_time = time.perf_counter()
+            accumulator += current_time - previous_time
+            previous_time = current_time
+
+            # After a long hitch, the level slows down instead of trying to catch up on every missed update
+            accumulator = min(accumulator, self.MAX_CATCH_UP * dt)
+
+            while accumulator >= dt and self.run_level_sequence:
+                self.update() # Updates physics and the logic of the level
+                accumulator -= dt
+
+            self.render(accumulator / dt) # Draws (alt. updates) the visuals on the screen and window
+            self.profiler.end_frame()
+
+    # Loads a level directly, without the loading menu (used by headless runs)
+    def load_level(self, level):
+        self.LEVEL_INFO.current_level = level
+        self.LEVEL_INFO.load_level(Queue(), self)
+
+    # Steps the current level as fast as the CPU allows, without rendering, for 'ticks' ticks or until the level ends.
+    # Returns the number of ticks that were run and the time it took (in seconds).
+    def simulate(self, ticks=None):
+        self.button_cooldown = True
+
+        count = 0
+        start = time.perf_counter()
+        while self.run_level_sequence and (ticks is None or count < ticks):
+            self.update()
+            count += 1
+
+        return count, time.perf_counter() - start
     
     def update(self):
-        self.clock.tick(self.FRAMES_PER_SECOND) # Limits the FPS
-        dt = 1 / self.FRAMES_PER_SECOND # Time between frames (dt = delta time)
+        dt = 1 / self.TICKS_PER_SECOND # Time between updates (dt = delta time)
+
+        self.profiler.lap('update (other)')
+        if not self.input(): # Checks input from mouse and keyboard
+            return # The replayed recording has ended
+        self.profiler.lap('input')
 
-        self.input() # Checks input from mouse and keyboard
+        self.previous_offset = self.offset
 
-        self.LEVEL_INFO.entities.update(dt, self.LEVEL_INFO.static, self) # Updates the physics and logic for dynamic objects (such as the player, enemies, particles, etc)
+        self.LEVEL_INFO.stream.update(Rectangle(self.offset, self.res_screen), self.LEVEL_INFO.entities) # Streams in the part of the level around the camera
+        self.profiler.lap('stream')
+
+        self.LEVEL_INFO.entities.update(dt, self.LEVEL_INFO.static, self) # Updates the physics and logic for dynamic objects (such as the player, enemies, etc)
+        self.LEVEL_INFO.particles.update(dt, self.LEVEL_INFO.static) # Updates the physics of all particles at once
+        self.profiler.lap('particles')
+        self.LEVEL_INFO.projectiles.update(dt, self.LEVEL_INFO.static, self) # Moves every projectile at once, and hurts the player if hit
+        self.profiler.lap('projectiles')
 
         self.offset = [self.offset[n] + ([self.target.x + self.target.w / 2, self.target.y + self.target.h / 2][n] - self.res_screen[n] / [2, 1.8][n] - self.offset[n]) // 12 for n in range(2)] # Updates the visual offset-
         # (objects remain at their original coordinates, however, the offset creates the illusion of player movement where objects - even static - move relative to the players position)
@@ -116,69 +202,94 @@ class Game:
         if self.hurt > 0:
             self.hurt -= 1
 
-        self.camera.update(self.LEVEL_INFO.static, self.offset)
+        self.profiler.lap('update (other)')
 
         #pointer_position = [pygame.mouse.get_pos()[n] / self.res_offset[n] + self.offset[n] for n in range(2)]
         #print(f'{pointer_position}')
 
+    # Reads the input of the next update into 'controls' (recorded or replayed if there is a session).
+    # Returns False when a replay has run out of input, which ends the level.
     def input(self):
-        key = pygame.key.get_pressed()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.run_level_sequence = False
                 self.run_application = False
 
-        if key[pygame.K_ESCAPE]:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.show_profiler = not self.show_profiler
+                self.profiler.enable(self.show_profiler or self.PROFILE_EXPORT is not None)
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                self.show_debug = not self.show_debug
+
+        if not self.session:
+            self.controls = Controls.poll()
+        elif (controls := self.session.tick(self)):
+            self.controls = controls
+        else:
             self.run_level_sequence = False
-            self.current_menu = self.MENU['PAUSE']
+            return False
 
-        mouse = pygame.mouse.get_pressed()
+        mouse = self.controls.buttons
         if not mouse[0]:
             self.button_cooldown = False
 
-    def render(self):
+        key = self.controls.keys
+        if key[pygame.K_ESCAPE]:
+            if isinstance(self.session, Replayer):
+                self.button_cooldown = True # A replay does not pause: it resumes right away, as the recording did when it was resumed (see level_sequence)
+            else:
+                self.run_level_sequence = False
+                self.current_menu = self.MENU['PAUSE']
+
+        return True
+
+    # Draws the level as it was 'alpha' (0 to 1) of the way from the previous update to the latest one
+    def render(self, alpha=1):
         if (screen := self.screen): # is there a screen...? If so, render visuals onto it.
 
+            offset = [self.previous_offset[n] + (self.offset[n] - self.previous_offset[n]) * alpha for n in range(2)]
+
             screen.fill((11,11,11)) # Base background
                 
             if (background := self.LEVEL_INFO.background):
-                screen.blit(background, (16 - self.offset[0], -self.offset[1] - 1)) # Background
-
-            self.LEVEL_INFO.entities.render(screen, self.offset) # Entities (such as the player and the enemies)
+                self.camera.update(background, offset) # Only the pieces of the background in view (see ImageChunks)
+                self.camera.render(screen, offset) # Background
+            self.profiler.lap('background')
+
+            self.LEVEL_INFO.entities.render(screen, offset, alpha) # Entities (such as the player and the enemies)
+            if self.show_debug:
+                self.LEVEL_INFO.entities.render_debug(screen, offset)
+            self.profiler.lap('entities (fblits)')
+            self.LEVEL_INFO.particles.render(screen, offset, alpha) # Particles
+            self.profiler.lap('particles (render)')
+            self.LEVEL_INFO.projectiles.render(screen, offset, alpha) # Projectiles
+            self.profiler.lap('projectiles (render)')
 
             if (foreground := self.LEVEL_INFO.foreground):
-                screen.blit(foreground, (16 - self.offset[0], -self.offset[1] - 1)) # Foreground
+                self.camera.update(foreground, offset)
+                self.camera.render(screen, offset) # Foreground
+                self.profiler.lap('foreground')
             else:
-                self.camera.render(screen, self.offset) # displays the collidable blocks # The level boundaries
+                self.camera.update(self.LEVEL_INFO.chunks, offset)
+                self.profiler.lap('camera update')
+                self.camera.render(screen, offset) # displays the collidable blocks # The level boundaries
+                self.profiler.lap('foreground')
 
             #pygame.draw.rect(screen, (255,0,255), (self.target.door.x - self.offset[0], self.target.door.y - self.offset[1], self.target.door.w, self.target.door.h), 1)
 
-            health_colour = [0,0,0]
-            health_shake = [0,0]
-            if self.target.health > 60:
-                health_colour = (255,255,255)
-            elif self.target.health > 40:
-                health_colour = (155,40,0)
-                health_shake = [random.randint(0, 1) - 0.5 for _ in range(2)]
-            elif self.target.health > 20:
-                health_colour = (139,20,0)
-                health_shake = [random.randint(0, 2) - 1 for _ in range(2)]
-            elif self.target.health > 0:
-                health_colour = (139,0,0)
-                health_shake = [random.randint(0, 4) - 2 for _ in range(2)]
-
-            if self.hurt:
-                screen.blit(self.hurt_indicator, (0,0))
             #if self.target.health <= 0:
             #    screen.blit(self.death_screen, (0,0))
 
-            player_health = self.FONT.render(f'HP:{self.target.health}', True, health_colour)
-            screen.blit(player_health, (5 + health_shake[0], 0 + health_shake[1]))
+            self.hud.render(screen, self) # Health, hurt indicator and the custom mouse cursor
+            self.profiler.lap('hud')
 
-            if self.run_level_sequence:
-                mouse_pos = pygame.mouse.get_pos()
-                pygame.draw.rect(screen, (255,255,255), (mouse_pos[0] / self.res_offset[0], mouse_pos[1] / self.res_offset[1], 2, 2)) # Renders a custom mouse cursor
+            if self.show_profiler:
+                self.profiler.render(screen, 1 / max(self.FRAMES_PER_SECOND, self.TICKS_PER_SECOND))
+                self.profiler.lap('profiler')
 
             # Upscales screen resolution to match size of window
-            self.window.blit(pygame.transform.scale(screen, self.res_window), (0,0))
-            pygame.display.update()
\ No newline at end of file
+            self.backend.upscale(screen)
+            self.profiler.lap('upscale')
+            self.backend.flip()
+            self.profiler.lap('flip')
\ No newline at end of file
@@ -7,5 +7,11 @@ def main():
         g.current_menu.menu_sequence()
         g.level_sequence()
 
+    if g.session:
+        g.session.end()
+
+    if g.PROFILE_EXPORT:
+        g.profiler.export(g.PROFILE_EXPORT)
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,44 @@
+# Standard
+import sys
+import argparse
+
+# Local
+from game import Game
+from utilities.replay import Replayer
+
+"""
+Replays a recording of a level (see utilities/replay.py) without a window and without a frame cap, and reports how
+many ticks per second it ran at, and whether the level did the same as when it was recorded (by the checksums kept
+in the recording). A recording does the same work on every run, so it can be used as a repeatable perf run.
+"""
+def main():
+    parser = argparse.ArgumentParser(description='Replays a recorded level headlessly and reports ticks per second.')
+    parser.add_argument('recording', help='recording to replay (a .btsr file in recordings/)')
+    parser.add_argument('--repeat', type=int, default=1, help='number of times to replay it (default: 1)')
+    args = parser.parse_args()
+
+    g = Game(headless=True)
+
+    for _ in range(args.repeat):
+        replayer = g.session = Replayer(args.recording)
+        g.load_level(replayer.level)
+
+        ticks, seconds = g.simulate()
+        rate = ticks / seconds if seconds else 0
+
+        # Every recorded tick has to be replayed, with the same state, for the replay to count
+        if replayer.ticks < len(replayer.controls):
+            result = f'ended early, at tick {replayer.ticks}'
+        elif replayer.mismatch is not None:
+            result = f'differs from tick {replayer.mismatch}'
+        else:
+            result = 'matches'
+
+        print(f'Level {replayer.level}: {replayer.ticks} of {len(replayer.controls)} ticks in {seconds:.3f}s ({rate:.1f} ticks/s), '
+              f'state {result} ({replayer.checked} checksums)')
+
+        if result != 'matches':
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+# Standard
+import argparse
+
+# Local
+from game import Game
+
+"""
+Runs a level without a window and without a frame cap, and reports how many ticks per second
+the simulation (entities, physics and collision) manages. Meant for display-less perf and soak runs.
+"""
+def main():
+    parser = argparse.ArgumentParser(description='Runs a level headlessly and reports ticks per second.')
+    parser.add_argument('level', type=int, help='index of the level in world/simplified to run')
+    parser.add_argument('--ticks', type=int, default=None, help='number of ticks to run (default: until the level ends)')
+    args = parser.parse_args()
+
+    g = Game(headless=True)
+    g.load_level(args.level)
+
+    ticks, seconds = g.simulate(args.ticks)
+    rate = ticks / seconds if seconds else 0
+
+    print(f'Level {args.level}: {ticks} ticks in {seconds:.3f}s ({rate:.1f} ticks/s, {g.LEVEL_INFO.entities.len()} entities, '
+          f'tile merge ratio {g.LEVEL_INFO.static.merge_ratio():.2f})')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# Standard
+import os
+
+# 3rd party
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+import pytest
+
+# Local
+from utilities.grid import TileGrid
+from utilities.particles import Particles
+from utilities.projectiles import Projectiles
+from utilities.manager import EntityManager
+from utilities.entities import Player, Remnant, Tile
+from utilities.profiler import Profiler
+from utilities.replay import Controls
+
+"""
+Synthetic levels, shared by the tests and the benchmarks (see benchmarks/cases.py). Tiles are laid out in platforms
+of ROW_LENGTH tiles, and a level has a remnant standing on every tile, so the size of a level scales both.
+"""
+
+TILE_SIZE = (16, 16)
+ROW_LENGTH = 100 # Tiles per platform
+ROW_SPACING = 6 # Tiles between platforms
+
+ANIMATIONS = ('idle', 'run', 'jump', 'fall', 'transition', 'attack', 'death')
+
+
+"""
+Class Stage(): Stands in for the Game object, with the attributes that entities read and write during an update.
+"""
+class Stage:
+    def __init__(self, entities):
+        self.LEVEL_INFO = self
+        self.entities = entities
+        self.current_level = 0
+
+        self.run_level_sequence = True
+        self.button_cooldown = True
+        self.screen_shake = 0
+        self.hurt = 0
+
+        self.offset = [0, 0]
+        self.res_offset = [4.8, 4.8]
+
+        self.profiler = Profiler() # Disabled, as in a normal run
+        self.particles = Particles()
+        self.projectiles = Projectiles()
+        self.controls = Controls() # Nothing held down
+
+
+def tiles(amount):
+    image = pygame.Surface(TILE_SIZE)
+    tiles = []
+
+    for n in range(amount):
+        x = (n % ROW_LENGTH) * TILE_SIZE[0]
+        y = (n // ROW_LENGTH + 1) * TILE_SIZE[1] * ROW_SPACING
+
+        tiles.append(Tile(image, (x, y), TILE_SIZE, 1))
+
+    return tiles
+
+def grid(amount, extra=()):
+    rows = [[0] * ROW_LENGTH for _ in range((amount // ROW_LENGTH + 1) * ROW_SPACING + 1)]
+    for tile in tiles(amount) + list(extra):
+        for x in range(tile.x // TILE_SIZE[0], (tile.x + tile.w) // TILE_SIZE[0]):
+            rows[tile.y // TILE_SIZE[1]][x] = 1
+
+    image = pygame.Surface(TILE_SIZE)
+    return TileGrid(rows, (0, 0), TILE_SIZE, lambda id: image, (1,))
+
+def assets(frame_size):
+    frames = [pygame.Surface(frame_size) for _ in range(4)]
+    return {name : [frames, frames] for name in ANIMATIONS}
+
+"""
+Function level(): Returns the EntityManager (the player and 'amount' remnants), the TileGrid and the Stage of a level.
+"""
+def level(amount):
+    level_tiles = tiles(amount)
+
+    # The player stands on its own platform, above and away from the enemies
+    player_floor = Tile(level_tiles[0].image, (0, TILE_SIZE[1] * 2), (TILE_SIZE[0] * 4, TILE_SIZE[1]), 1)
+    static = grid(amount, [player_floor])
+
+    player_assets = assets((192, 192))
+    player = Player(player_assets['run'][0][0], (10, player_floor.y - 26), (14, 26), player_assets)
+
+    remnant_assets = assets((92, 36))
+    remnants = []
+    for n in range(amount):
+        tile = level_tiles[n % len(level_tiles)]
+        remnants.append(Remnant(remnant_assets['run'][0][0], (tile.x, tile.y - 24), (16, 24), remnant_assets))
+
+    manager = EntityManager()
+    manager.add_player(player)
+    manager.add_multiple(remnants)
+
+    return manager, static, Stage(manager)
+
+
+@pytest.fixture
+def small_level():
+    return level(10)
+
+
+# A window, for the tests that convert images to the display's pixel format
+@pytest.fixture
+def display():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.display.quit()
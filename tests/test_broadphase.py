@@ -0,0 +1,84 @@
+# Standard
+import random
+
+# Local
+from utilities.shapes import Rectangle
+from utilities.broadphase import SweepAndPrune
+
+
+"""
+Class Body(): An entity with a hitbox, and optionally the area it attacks and the area it can see.
+"""
+class Body:
+    def __init__(self, rng, spread):
+        x, y = rng.uniform(0, spread[0]), rng.uniform(0, spread[1])
+        self.rects = [('body', Rectangle((x, y), (rng.randint(8, 40), rng.randint(8, 40))))]
+
+        if rng.random() < 0.5:
+            self.rects.append(('attack', Rectangle((x - 20, y), (rng.randint(10, 60), 20))))
+        if rng.random() < 0.5:
+            self.rects.append(('view', Rectangle((x - 100, y - 50), (200, 100))))
+
+    def proxies(self):
+        return self.rects
+
+    def move(self, rng):
+        dx, dy = rng.uniform(-8, 8), rng.uniform(-8, 8)
+        for _, rect in self.rects:
+            rect.x += dx
+            rect.y += dy
+
+
+def brute_force(entities, channel):
+    pairs = []
+    for a in entities:
+        for b in entities:
+            if a is b:
+                continue
+
+            for kind_a, rect_a in a.proxies():
+                for kind_b, rect_b in b.proxies():
+                    if (kind_a, kind_b) == channel and rect_a.collide(rect_b):
+                        pairs.append((a, b))
+
+    return pairs
+
+def check(broadphase, entities):
+    for channel in SweepAndPrune.CHANNELS:
+        found = broadphase.candidates[channel]
+
+        if channel[0] == channel[1]:
+            # A pair of the same kind is reported once, in either order
+            unordered = [frozenset((id(a), id(b))) for a, b in found]
+            assert len(unordered) == len(set(unordered))
+            assert set(unordered) == {frozenset((id(a), id(b))) for a, b in brute_force(entities, channel)}
+        else:
+            ordered = [(id(a), id(b)) for a, b in found]
+            assert sorted(ordered) == sorted((id(a), id(b)) for a, b in brute_force(entities, channel))
+
+
+def test_pairs_match_brute_force():
+    for seed, spread in ((0, (2000, 200)), (1, (200, 2000)), (2, (400, 400))):
+        rng = random.Random(seed)
+        entities = [Body(rng, spread) for _ in range(120)]
+        broadphase = SweepAndPrune()
+
+        broadphase.update(entities)
+        check(broadphase, entities)
+
+
+def test_pairs_follow_moves_and_removals():
+    rng = random.Random(3)
+    entities = [Body(rng, (1000, 300)) for _ in range(100)]
+    broadphase = SweepAndPrune()
+
+    for frame in range(30):
+        for entity in entities:
+            entity.move(rng)
+
+        if frame % 5 == 0:
+            del entities[rng.randrange(len(entities))]
+            entities.append(Body(rng, (1000, 300)))
+
+        broadphase.update(entities)
+        check(broadphase, entities)
@@ -0,0 +1,88 @@
+# Standard
+import math
+import random
+from threading import Event
+
+# 3rd party
+import pygame
+
+# Local
+from utilities.shapes import Rectangle
+from utilities.chunks import TileChunks, ImageChunks
+from utilities.streaming import WorldStream
+from utilities.spritecache import CachedFrames
+from utilities.camera import Camera
+from tests.conftest import grid
+
+VIEW = (480, 270)
+POSITION = (16, -1) # Reaches past the top and right of the level, like the level images do
+
+
+# A noisy image as large as the level, so that every misplaced pixel shows
+def image(tmp_path, size):
+    rng = random.Random(0)
+    surface = pygame.Surface(size)
+    for x in range(0, size[0], 8):
+        for y in range(0, size[1], 8):
+            surface.fill((rng.randrange(256), rng.randrange(256), rng.randrange(256)), (x, y, 8, 8))
+
+    path = str(tmp_path / 'background.png')
+    pygame.image.save(surface, path)
+    return path, pygame.image.load(path).convert_alpha()
+
+def layer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path) # The pieces are cached under cache/
+    static = grid(400)
+    path, full = image(tmp_path, (static.columns * static.tile_w, static.rows * static.tile_h))
+
+    chunks = TileChunks(static)
+    image_chunks = ImageChunks(chunks, POSITION, full.get_size())
+    image_chunks.open(path)
+
+    return chunks, image_chunks, full
+
+# Waits for the jobs on the background thread of 'stream' to finish
+def settle(stream):
+    done = Event()
+    stream.load(done.set)
+    done.wait()
+
+
+def test_pieces_draw_the_whole_image(tmp_path, monkeypatch, display):
+    _, image_chunks, full = layer(tmp_path, monkeypatch)
+    assert isinstance(image_chunks.pieces, CachedFrames)
+
+    camera = Camera(VIEW)
+    rng = random.Random(1)
+
+    for _ in range(50):
+        offset = (rng.uniform(-300, 1500), rng.uniform(-200, 600))
+
+        expected = pygame.Surface(VIEW)
+        expected.blit(full, (math.floor(POSITION[0] - offset[0]), math.floor(POSITION[1] - offset[1])))
+
+        drawn = pygame.Surface(VIEW)
+        camera.update(image_chunks, offset)
+        camera.render(drawn, offset)
+
+        assert pygame.image.tobytes(drawn, 'RGB') == pygame.image.tobytes(expected, 'RGB')
+
+
+def test_pieces_are_streamed_with_the_tiles(tmp_path, monkeypatch, display, small_level):
+    chunks, image_chunks, _ = layer(tmp_path, monkeypatch)
+    manager, _, _ = small_level
+    stream = WorldStream(chunks, None, layers=[image_chunks])
+
+    try:
+        # Only the pieces near the view are kept, including the ones past the top of the level
+        stream.update(Rectangle((0, 0), VIEW), manager)
+        settle(stream)
+        image_chunks.visible(Rectangle((0, -20), VIEW))
+        assert image_chunks.surfaces and all(key[0] <= 3 for key in image_chunks.surfaces)
+        assert (0, -1) in image_chunks.surfaces
+
+        stream.update(Rectangle((1300, 0), VIEW), manager)
+        settle(stream)
+        assert all(key[0] >= 3 for key in image_chunks.surfaces)
+    finally:
+        stream.stop()
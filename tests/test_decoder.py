@@ -0,0 +1,38 @@
+# Standard
+from multiprocessing.shared_memory import SharedMemory
+
+# 3rd party
+import pygame
+import pytest
+
+# Local
+from utilities.decoder import ImageDecoder
+
+
+def decoded_blocks(decoder, paths):
+    return [decoder.pending[path].result()[1] for path in paths]
+
+def assert_freed(names):
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name)
+
+
+def test_discarded_and_outstanding_images_are_freed(tmp_path):
+    paths = []
+    for n in range(3):
+        paths.append(str(tmp_path / f'{n}.png'))
+        pygame.image.save(pygame.Surface((8, 8)), paths[-1])
+
+    decoder = ImageDecoder(workers=2)
+    try:
+        decoder.prefetch(paths)
+        names = decoded_blocks(decoder, paths)
+
+        decoder.discard(paths[:1]) # e.g. the images of a level that was dropped
+        assert_freed(names[:1])
+    finally:
+        decoder.close() # The rest, as at exit
+
+    assert not decoder.pending
+    assert_freed(names[1:])
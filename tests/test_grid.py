@@ -0,0 +1,91 @@
+# Standard
+import random
+
+# 3rd party
+import pygame
+
+# Local
+from utilities.shapes import Rectangle
+from utilities.grid import TileGrid
+from tests.conftest import TILE_SIZE
+
+# Not at (0, 0), so that the tests also cover the origin of the grid
+ORIGIN = (-40, 24)
+
+
+# A level of mostly merged tiles (1), with some that are never merged (2)
+def grid(seed, columns=40, rows=30):
+    rng = random.Random(seed)
+    cells = [[rng.choice((0, 0, 1, 1, 1, 2)) for _ in range(columns)] for _ in range(rows)]
+
+    image = pygame.Surface(TILE_SIZE)
+    return TileGrid(cells, ORIGIN, TILE_SIZE, lambda id: image, (1,))
+
+def cell_rect(grid, index):
+    return Rectangle((grid.x + (index % grid.columns) * grid.tile_w, grid.y + (index // grid.columns) * grid.tile_h), TILE_SIZE)
+
+
+def test_merged_colliders_cover_merged_cells_once():
+    for seed in range(5):
+        static = grid(seed)
+        covered = [0] * len(static.cells)
+
+        for owner, collider in enumerate(static.colliders):
+            column, row = (collider.x - static.x) // static.tile_w, (collider.y - static.y) // static.tile_h
+            for y in range(row, row + collider.h // static.tile_h):
+                for x in range(column, column + collider.w // static.tile_w):
+                    index = y * static.columns + x
+                    assert static.cells[index] == collider.id == 1
+                    assert static.owners[index] == owner
+                    covered[index] += 1
+
+        for index, id in enumerate(static.cells):
+            assert covered[index] == (1 if id == 1 else 0)
+            assert (static.owners[index] != -1) == (id == 1)
+
+
+def test_merge_is_greedy():
+    static = grid(0)
+    owners, columns = static.owners, static.columns
+
+    # Every collider is as wide as it can be, and could not grow by another full row
+    for owner, collider in enumerate(static.colliders):
+        column, row = (collider.x - static.x) // static.tile_w, (collider.y - static.y) // static.tile_h
+        width, height = collider.w // static.tile_w, collider.h // static.tile_h
+
+        right = row * columns + column + width
+        assert column + width == columns or static.cells[right] != 1 or owners[right] < owner
+
+        below = (row + height) * columns + column
+        if row + height < static.rows:
+            assert any(static.cells[n] != 1 or owners[n] < owner for n in range(below, below + width))
+
+
+def test_hit_matches_brute_force():
+    static = grid(1)
+    rng = random.Random(2)
+
+    for _ in range(500):
+        rect = Rectangle((rng.uniform(-100, 700), rng.uniform(-50, 550)), (rng.choice((1, 14, 16, 40, 400)), rng.choice((1, 16, 24, 225))))
+
+        expected = set()
+        for index, id in enumerate(static.cells):
+            if id and rect.collide(cell_rect(static, index)):
+                owner = static.owners[index]
+                expected.add(static.colliders[owner] if owner != -1 else static.tile(index))
+
+        assert static.hit(rect) == expected
+
+
+def test_set_merges_again():
+    static = grid(3)
+    rng = random.Random(4)
+
+    for _ in range(20):
+        static.set(rng.randrange(static.columns), rng.randrange(static.rows), rng.choice((0, 1, 2)))
+
+    fresh = TileGrid([list(static.cells[row * static.columns : (row + 1) * static.columns]) for row in range(static.rows)],
+                     ORIGIN, TILE_SIZE, static.image_lookup, (1,))
+
+    assert [(c.x, c.y, c.w, c.h) for c in static.colliders] == [(c.x, c.y, c.w, c.h) for c in fresh.colliders]
+    assert list(static.owners) == list(fresh.owners)
@@ -0,0 +1,47 @@
+# Standard
+import os
+import json
+
+# 3rd party
+import pytest
+
+# Local
+from utilities.level import LevelFile, compile_level, COMPILED_NAME, MERGED_TILES
+
+
+def write_level(directory):
+    rows = [[1, 1, 0, 0], [0, 0, 0, 4], [1, 1, 1, 1]]
+    entities = [[0, 1, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]]
+
+    with open(os.path.join(directory, 'data.json'), 'w') as file:
+        json.dump({'x' : 0, 'y' : 0, 'width' : 64, 'height' : 48}, file)
+    for name, grid_rows in (('TileGrid.csv', rows), ('EntityGrid.csv', entities)):
+        with open(os.path.join(directory, name), 'w') as file:
+            file.write('\n'.join(','.join(map(str, row)) for row in grid_rows))
+
+    path = os.path.join(directory, COMPILED_NAME)
+    with open(path, 'wb') as file:
+        file.write(compile_level(directory, MERGED_TILES))
+
+    return path
+
+
+def test_compiled_level_reads_back(tmp_path):
+    level_file = LevelFile(write_level(tmp_path))
+
+    assert (level_file.columns, level_file.rows) == (4, 3)
+    assert list(level_file.tiles) == [1, 1, 0, 0, 0, 0, 0, 4, 1, 1, 1, 1]
+    assert list(level_file.entity_cells()) == [(1, 0, 1)]
+    assert level_file.merged(MERGED_TILES) is not None
+
+
+@pytest.mark.parametrize('keep', [0, 10, 40, -6])
+def test_truncated_level_raises_value_error(tmp_path, keep):
+    path = write_level(tmp_path)
+    with open(path, 'rb') as file:
+        data = file.read()
+    with open(path, 'wb') as file:
+        file.write(data[:keep])
+
+    with pytest.raises(ValueError):
+        LevelFile(path)
@@ -0,0 +1,60 @@
+# Local
+from utilities.entities import Player, Remnant
+
+
+def test_dead_player_stays_resolvable(small_level):
+    manager, static, stage = small_level
+    player = manager.retr_player()
+    assert manager.of_type(Remnant)
+
+    player.health = 0
+    player.is_alive = False
+    manager.update(1 / 60, static, stage)
+
+    assert manager.retr_player() is player
+    assert stage.run_level_sequence is False
+
+    # The pools that run after the player's (and the projectiles) still find it
+    manager.update(1 / 60, static, stage)
+    stage.projectiles.fire((player.x, player.y), (0, 0))
+    stage.projectiles.update(1 / 60, static, stage)
+
+
+def test_swap_remove_keeps_handles_valid(small_level):
+    manager, _, _ = small_level
+    remnants = list(manager.of_type(Remnant))
+    handles = {remnant.handle : remnant for remnant in remnants}
+
+    # The first, a middle and the last remnant of the pool
+    for remnant in (remnants[0], remnants[5], remnants[-1]):
+        manager.remove(remnant)
+        del handles[remnant.handle]
+
+    pool = manager.of_type(Remnant)
+    assert len(pool) == len(remnants) - 3
+    for handle, remnant in handles.items():
+        assert manager.get(handle) is remnant
+        assert pool[remnant.slot] is remnant
+
+
+def test_stale_handle_returns_none(small_level):
+    manager, _, _ = small_level
+    remnant = manager.of_type(Remnant)[3]
+    handle = remnant.handle
+
+    manager.remove(remnant)
+    assert manager.get(handle) is None
+
+    # A handle is never given to another entity
+    manager.add(Remnant(remnant.image, (0, 0), (16, 24), remnant.assets))
+    assert manager.get(handle) is None
+
+
+def test_of_type_returns_the_pool_of_a_type(small_level):
+    manager, _, _ = small_level
+
+    assert list(manager.of_type(Player)) == [manager.retr_player()]
+    assert len(manager.of_type(Remnant)) == 10
+    assert all(type(entity) is Remnant for entity in manager.of_type(Remnant))
+    assert manager.of_type(int) == ()
+    assert manager.len() == 11
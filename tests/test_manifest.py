@@ -0,0 +1,42 @@
+# Standard
+import os
+
+# 3rd party
+import pygame
+
+# Local
+from utilities.manifest import Manifest
+
+
+def test_missing_file_is_indexed_again(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('images/player')
+    for name in ('idle.png', 'run.png'):
+        with open('images/player/' + name, 'wb') as file:
+            file.write(b'image')
+
+    Manifest()
+
+    # The file is removed without the folder's time changing (e.g. on a file system with coarse times)
+    stat = os.stat('images/player')
+    os.remove('images/player/run.png')
+    os.utime('images/player', ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert list(Manifest().files('images/player')) == ['idle.png']
+
+
+def test_frames_follow_from_the_image_header(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('images/player')
+    pygame.image.save(pygame.Surface((96, 24)), 'images/player/run.png')
+    with open('images/player/notes.txt', 'w') as file:
+        file.write('not an image')
+
+    manifest = Manifest()
+    assert (manifest.files('images/player')['run.png']['width'], manifest.files('images/player')['run.png']['height']) == (96, 24)
+
+    # Read back from the saved index
+    manifest = Manifest()
+    assert manifest.frames('images/player', 'run.png', 16) == 6
+    assert manifest.frames('images/player', 'notes.txt', 16) is None
+    assert manifest.frames('images/player', 'jump.png', 16) is None
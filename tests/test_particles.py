@@ -0,0 +1,75 @@
+# Standard
+import random
+
+# 3rd party
+import numpy as np
+import pygame
+
+# Local
+from utilities.grid import TileGrid
+from utilities.particles import Particles
+from tests.conftest import TILE_SIZE
+
+# Not at (0, 0), so that the tests also cover the origin of the grid
+ORIGIN = (-40, 24)
+
+
+# Scattered solid tiles inside a closed box, so that no particle leaves the grid
+def grid(seed, columns=30, rows=20):
+    rng = random.Random(seed)
+    cells = [[1 if x in (0, columns - 1) or y in (0, rows - 1) or rng.random() < 0.2 else 0 for x in range(columns)] for y in range(rows)]
+
+    image = pygame.Surface(TILE_SIZE)
+    return TileGrid(cells, ORIGIN, TILE_SIZE, lambda id: image, (1,))
+
+# The solid cells that each particle overlaps, found by testing every particle against every solid cell
+def overlapping(particles, static):
+    solid = np.array([index for index, id in enumerate(static.cells) if id])
+    left = static.x + (solid % static.columns) * static.tile_w
+    top = static.y + (solid // static.columns) * static.tile_h
+
+    x, y = particles.current_position[:particles.count, 0, None], particles.current_position[:particles.count, 1, None]
+    size = particles.size[:particles.count, None]
+    hits = (x + size > left) & (x < left + static.tile_w) & (y + size > top) & (y < top + static.tile_h)
+
+    return [list(solid[row]) for row in hits]
+
+def empty_cells(static):
+    return [index for index, id in enumerate(static.cells) if not id]
+
+
+def test_particles_never_end_inside_solid_tiles():
+    for seed in range(4):
+        random.seed(seed) # Particles.emit throws the particles with the random module
+        static = grid(seed)
+        particles = Particles(capacity=16)
+
+        # Bursts from the middle of random empty cells
+        for index in random.sample(empty_cells(static), 12):
+            particles.emit((static.x + (index % static.columns + 0.5) * static.tile_w,
+                            static.y + (index // static.columns + 0.5) * static.tile_h), 20)
+
+        while particles.count:
+            particles.update(1 / 60, static)
+
+            assert not any(overlapping(particles, static))
+
+
+def test_particles_come_to_rest_on_solid_tiles():
+    random.seed(0)
+    static = grid(0)
+    particles = Particles()
+
+    index = empty_cells(static)[0]
+    particles.emit((static.x + index % static.columns * static.tile_w, static.y + index // static.columns * static.tile_h), 50)
+    particles.time[:particles.count] = 1e6 # Long enough to come to rest
+
+    for _ in range(300):
+        particles.update(1 / 60, static)
+
+    n = particles.count
+    assert (particles.current_position[:n, 1] == particles.previous_position[:n, 1]).all()
+
+    # Each one lies on the top of a solid cell: one pixel lower, it would overlap it
+    particles.current_position[:n, 1] += 1
+    assert all(overlapping(particles, static))
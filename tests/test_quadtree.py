@@ -0,0 +1,30 @@
+# Standard
+import random
+
+# Local
+from utilities.shapes import Rectangle
+from utilities.quadtree import QuadTree
+
+
+def tiles(amount, seed=0):
+    rng = random.Random(seed)
+    return [Rectangle((rng.randrange(0, 1600, 16), rng.randrange(0, 960, 16)), (16 * rng.randint(1, 4), 16)) for _ in range(amount)]
+
+
+def test_every_item_is_kept_once():
+    for amount in (10, 100, 1000):
+        quadtree = QuadTree(tiles(amount))
+        assert sorted(quadtree.index) == list(range(amount))
+
+
+def test_query_matches_brute_force():
+    items = tiles(500, seed=1)
+    quadtree = QuadTree(items)
+    rng = random.Random(2)
+
+    for _ in range(500):
+        rect = Rectangle((rng.uniform(-50, 1650), rng.uniform(-50, 1000)), (rng.choice((1, 14, 16, 40, 400)), rng.choice((1, 16, 24, 225))))
+        result = quadtree.query(rect, [])
+
+        assert len(result) == len(set(map(id, result)))
+        assert {id(item) for item in result} == {id(items[n]) for n in rect.collide_all(items)}
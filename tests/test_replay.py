@@ -0,0 +1,64 @@
+# Standard
+import random
+
+# 3rd party
+import pygame
+
+# Local
+from utilities.replay import Controls, Recorder, Replayer, KEYS
+from tests.conftest import level
+
+TICKS = 300
+
+
+# Input that changes over time: walking right and left, jumping and attacking now and then
+def scripted(tick):
+    keys = {pygame.K_d} if (tick // 60) % 2 == 0 else {pygame.K_a}
+    if tick % 37 == 0:
+        keys.add(pygame.K_w)
+
+    return Controls(sum(1 << n for n, key in enumerate(KEYS) if key in keys), 1 if tick % 20 < 2 else 0, (tick % 400, 100))
+
+# Runs a level for TICKS updates, or until 'session' runs out of input, and returns its stage
+def play(session):
+    random.seed(0) # The level itself is built the same way each time
+    manager, static, stage = level(10)
+    dt = 1 / 60
+
+    session.begin(stage)
+    while session.ticks < TICKS and (controls := session.tick(stage)):
+        stage.controls = controls
+        manager.update(dt, static, stage)
+        stage.particles.update(dt, static)
+        stage.projectiles.update(dt, static, stage)
+
+    session.end()
+    return stage
+
+
+def record(tmp_path, monkeypatch):
+    recorder = Recorder(str(tmp_path), interval=10)
+    monkeypatch.setattr(Controls, 'poll', classmethod(lambda cls: scripted(recorder.ticks)))
+
+    play(recorder)
+    return recorder.path
+
+
+def test_replay_matches_recording(tmp_path, monkeypatch):
+    replayer = Replayer(record(tmp_path, monkeypatch))
+    assert len(replayer.controls) == TICKS
+
+    play(replayer)
+
+    assert replayer.ticks == TICKS
+    assert replayer.checked == TICKS // 10
+    assert replayer.mismatch is None
+
+
+def test_replay_detects_changed_input(tmp_path, monkeypatch):
+    replayer = Replayer(record(tmp_path, monkeypatch))
+    replayer.controls[5] = Controls(1 << KEYS.index(pygame.K_w)) # Jumps where the recording did not
+
+    play(replayer)
+
+    assert replayer.mismatch is not None
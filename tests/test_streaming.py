@@ -0,0 +1,43 @@
+# Local
+from utilities.shapes import Rectangle
+from utilities.chunks import TileChunks
+from utilities.streaming import WorldStream
+from utilities.entities import Remnant
+from tests.conftest import grid
+
+# A level of 1000 tiles is 1600 pixels wide, so a view at either end leaves the chunks of the other end inactive
+LEFT = Rectangle((0, 0), (200, 200))
+RIGHT = Rectangle((1400, 0), (200, 200))
+
+
+def test_entity_outside_the_level_is_restored(small_level):
+    manager, _, _ = small_level
+    stream = WorldStream(TileChunks(grid(1000)), None)
+
+    try:
+        remnant = manager.of_type(Remnant)[0]
+        remnant.x, remnant.y = -40, -300 # Knocked past the top left corner of the level
+
+        stream.update(RIGHT, manager)
+        assert manager.get(remnant.handle) is None
+
+        stream.update(LEFT, manager)
+        assert manager.get(remnant.handle) is remnant
+    finally:
+        stream.stop()
+
+
+def test_spawn_outside_the_level_is_created(small_level):
+    manager, _, _ = small_level
+    template = manager.of_type(Remnant)[0]
+    stream = WorldStream(TileChunks(grid(1000)), lambda position, id: Remnant(template.image, position, (16, 24), template.assets))
+
+    try:
+        stream.add_spawn((-40, -300), 2)
+        stream.update(RIGHT, manager)
+        assert not any(remnant.x == -40 for remnant in manager.of_type(Remnant))
+
+        stream.update(LEFT, manager)
+        assert any(remnant.x == -40 for remnant in manager.of_type(Remnant))
+    finally:
+        stream.stop()
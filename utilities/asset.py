@@ -1,16 +1,17 @@
-# Standard
-import os
-
 # 3rd party
 import pygame
 
+# Local
+from .manifest import Manifest
+from .spritecache import SpriteCache
+from .decoder import ImageDecoder
+from .surfacecache import SurfaceCache
+
 """
 Class Asset(): Searches for images in a given folder, subsequently loads them into memory, and
 then assigns those images to a public attribute to be used by other classes and objects.
 """
 class Asset:
-    cached_spritesheets = {}
-    
     """
     Method __init__: Initialises assets / images to a public attribute by calling update_spritehsheet().
     """
@@ -23,51 +24,70 @@ class Asset:
         self.update_spritesheets()
 
     """
-    Method update_spritesheets(): Checks if the requested images are already stored in memory - otherwise
-    it calls find() and stores them into memory - and then it assigns the assets to the public attribute.
+    Method update_spritesheets(): Checks if the requested images are already stored in memory (the shared
+    SurfaceCache) - otherwise it calls find() and stores them into memory - and then it assigns the assets to the
+    public attribute.
     """
     def update_spritesheets(self):
-        cached_lookup = self.folder_name
+        cached_lookup = ('asset', self.folder_name, self.size, self.scale)
 
-        if not (cached_spritesheet := self.cached_spritesheets.get(cached_lookup, None)):
+        if not (cached_spritesheet := SurfaceCache.shared().get(cached_lookup, None)):
             cached_spritesheet = self.find()
 
-            self.cached_spritesheets[cached_lookup] = cached_spritesheet
+            SurfaceCache.shared().put(cached_lookup, cached_spritesheet)
 
         self.spritesheets = cached_spritesheet[self.folder_name]
 
     """
-    Method find(): Looks through root directory in search of images and loads them. In the case of
-    spritesheets, they are cut into individual frames and stored as a list.
+    Method find(): Looks up the asset folders with the folder name in the asset manifest and loads their images. In the
+    case of spritesheets, they are cut into individual frames and stored as a list.
     """
     def find(self):
-        folders = [(root.replace('\\', '/'), subdir, files) for root, subdir, files in os.walk(os.getcwd())]
         colour = (146, 36, 210)
         assets = {}
 
-        for path, _, files in folders:
-            if self.folder_name in path.lower() and files:
-                folder_name = path.rpartition('/')[2]
-                assets[folder_name] = {}
+        folders = Manifest.shared().matching(self.folder_name)
+        variant = ('frames', self.size, self.scale, colour)
+
+        # The images that have to be decoded are all decoded at once, by other processes (see ImageDecoder)
+        decoded = [path + '/' + file for path, files in folders for file in files if not SpriteCache.shared().contains(path + '/' + file, variant)]
+        ImageDecoder.shared().prefetch(decoded)
+
+        for path, files in folders:
+            folder_name = path.rpartition('/')[2]
+            assets[folder_name] = {}
 
-                for file in files:
-                    image = pygame.image.load(path + '/' + file).convert_alpha()
+            for file in files:
+                # The finished frames are kept on disk, so the image is only decoded and cut the first time (see SpriteCache)
+                amount = Manifest.shared().frames(path, file, self.size[0])
+                frames = SpriteCache.shared().frames(path + '/' + file, variant, lambda: self.cut(path + '/' + file, colour, amount))
 
-                    frames = []
-                    amount = image.get_width() // self.size[0]
+                if len(frames) == 1:
+                    assets[folder_name].update({file.rpartition('.')[0] : frames[0]})
+                else:
+                    assets[folder_name].update({file.rpartition('.')[0] : frames})
+
+        ImageDecoder.shared().discard(decoded) # Frees the images that were not needed after all (e.g. cut by another thread meanwhile)
+        return assets
+
+    """
+    Method cut(): Loads an image and cuts it into frames of the asset size, scaled to the asset scale. Parts of a
+    frame that the image does not cover are filled with 'colour', which is made transparent. 'amount' is the number
+    of frames as indexed in the asset manifest; without it, it follows from the width of the decoded image.
+    """
+    def cut(self, path, colour, amount=None):
+        image = ImageDecoder.shared().load(path)
 
-                    for i in range(amount):
-                        frame = pygame.Surface(self.size).convert_alpha()
-                        frame.fill(colour)
-                        frame.blit(image, (0, 0), ((i * self.size[0]), 0, *self.size))
-                        frame = pygame.transform.scale(frame, self.scale)
-                        frame.set_colorkey(colour)
+        frames = []
+        amount = amount if amount else image.get_width() // self.size[0]
 
-                        frames.append(frame)
+        for i in range(amount):
+            frame = pygame.Surface(self.size).convert_alpha()
+            frame.fill(colour)
+            frame.blit(image, (0, 0), ((i * self.size[0]), 0, *self.size))
+            frame = pygame.transform.scale(frame, self.scale)
+            frame.set_colorkey(colour)
 
-                    if len(frames) == 1:
-                        assets[folder_name].update({file.rpartition('.')[0] : frames[0]})
-                    else:
-                        assets[folder_name].update({file.rpartition('.')[0] : frames})
+            frames.append(frame)
 
-        return assets
\ No newline at end of file
+        return frames
\ No newline at end of file
@@ -0,0 +1,109 @@
+# 3rd party
+import pygame
+
+"""
+Class SurfaceBackend(): Shows the game in a window made with pygame.display. The screen (drawn at the resolution of
+the game) is scaled straight into the surface of the window, so no new surface is made for it each frame.
+
+Menus draw onto 'surface' (at the resolution of the window) and show it with flip(). In headless mode the window is
+never shown, so 'surface' is a surface of its own, and the screen is still scaled into it (to time a frame as it would be).
+"""
+class SurfaceBackend:
+    def __init__(self, size, headless=False):
+        self.size = tuple(size)
+        self.window = pygame.display.set_mode(self.size if not headless else (1, 1))
+        self.surface = self.window if self.window.get_size() == self.size else pygame.Surface(self.size)
+
+    def set_title(self, title, icon):
+        pygame.display.set_caption(title)
+        pygame.display.set_icon(icon)
+
+    """
+    Method upscale(): Scales 'screen' to the size of the window (pixels are repeated, not blended); shown by flip().
+    """
+    def upscale(self, screen):
+        pygame.transform.scale(screen, self.size, self.surface)
+
+    """
+    Method flip(): Shows what has been drawn onto the window, or only the areas of 'rects' (a list of pygame.Rect) if given.
+    """
+    def flip(self, rects=None):
+        if rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(rects)
+
+    """
+    Method frame(): Returns the last frame shown, at the resolution of the window (e.g. for the pause menu to draw over).
+    """
+    def frame(self):
+        return self.surface
+
+
+"""
+Class TextureBackend(): Shows the game in a window drawn by SDL's renderer (pygame._sdl2.video), which scales the
+screen itself: only the small screen is copied into a texture each frame, and the renderer stretches the texture over
+the window - on the graphics card where there is one, and with SDL's software renderer otherwise (e.g. headless).
+
+Menus draw onto 'surface' like with SurfaceBackend; flip() copies the areas drawn into a texture of the window's size.
+"""
+class TextureBackend:
+    def __init__(self, size, headless=False):
+        from pygame._sdl2 import video
+
+        self.size = tuple(size)
+
+        # Surfaces still need a display mode to be converted to (convert() and convert_alpha()), so a hidden one is made
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+
+        self.window = video.Window('', self.size, hidden=headless)
+        self.renderer = video.Renderer(self.window)
+
+        self.surface = pygame.Surface(self.size)
+        self.video = video
+        self.surface_texture = video.Texture(self.renderer, self.size, streaming=True)
+
+        self.screen_texture = None # Made when the first screen is shown (to its size)
+        self.screen = None # Last screen shown, see frame()
+        self.upscaled = False # Whether the screen, not 'surface', is to be shown by the next flip()
+
+    def set_title(self, title, icon):
+        self.window.title = title
+        self.window.set_icon(icon)
+
+    def upscale(self, screen):
+        if not self.screen_texture or self.screen_texture.get_rect().size != screen.get_size():
+            self.screen_texture = self.video.Texture(self.renderer, screen.get_size(), streaming=True)
+
+        self.screen_texture.update(screen)
+        self.screen_texture.draw(dstrect=(0, 0, *self.size))
+
+        self.screen = screen
+        self.upscaled = True
+
+    def flip(self, rects=None):
+        if not self.upscaled:
+            bounds = self.surface.get_rect()
+
+            for rect in [bounds] if rects is None else rects:
+                if (rect := bounds.clip(rect)).w and rect.h:
+                    self.surface_texture.update(self.surface.subsurface(rect), area=rect)
+
+            self.surface_texture.draw(dstrect=(0, 0, *self.size)) # The whole window is drawn each time, as SDL does not keep the last one
+            self.screen = None # The menu is drawn over the last frame now
+
+        self.renderer.present()
+        self.upscaled = False
+
+    def frame(self):
+        if self.screen:
+            pygame.transform.scale(self.screen, self.size, self.surface)
+            self.screen = None
+
+        return self.surface
+
+
+BACKENDS = {
+    'surface' : SurfaceBackend,
+    'texture' : TextureBackend,
+}
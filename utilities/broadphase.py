@@ -0,0 +1,100 @@
+"""
+Class Proxy(): A rectangle that takes part in the broadphase on behalf of an entity. The kind tells what
+the rectangle is for, e.g. 'body' for the entity's hitbox or 'view' for the area it can see.
+"""
+class Proxy:
+    __slots__ = ('owner', 'kind', 'rect')
+
+    def __init__(self, owner, kind, rect):
+        self.owner = owner
+        self.kind = kind
+        self.rect = rect
+
+
+"""
+Class SweepAndPrune(): Finds the pairs of entities whose rectangles overlap, without testing every entity against
+every other one. The rectangles are kept sorted by their leading edge along one axis, so that a rectangle only has to
+be tested against the ones that start before it ends. The order is kept between frames, and since entities only move
+a little each frame the list is nearly sorted already, which the sort (Timsort) repairs in close to linear time.
+The axis is the one along which the entities are most spread out, and is chosen again whenever entities come or go.
+
+Only pairs whose kinds match one of the channels are reported, e.g. ('view', 'body') reports every 'view' rectangle
+that overlaps a 'body' rectangle.
+"""
+class SweepAndPrune:
+    CHANNELS = (('body', 'body'), ('attack', 'body'), ('view', 'body'))
+
+    def __init__(self, channels=CHANNELS):
+        self.channels = channels
+        self.proxies = [] # Sorted by the leading edge of their rectangle along the axis
+        self.members = set() # Entities with proxies
+        self.unindexed = [] # Entities without proxies (not in the broadphase)
+        self.axis = 'x'
+
+        # Overlapping pairs found by the last update, per channel: (owner of the first kind, owner of the second kind)
+        self.candidates = {channel : [] for channel in channels}
+
+    """
+    Method update(): Adds proxies for new entities, drops the proxies of removed entities, restores the order and
+    finds the overlapping pairs.
+    """
+    def update(self, entities):
+        present = set(entities)
+
+        if present != self.members:
+            self.proxies = [proxy for proxy in self.proxies if proxy.owner in present]
+
+            for entity in entities:
+                if entity not in self.members and hasattr(entity, 'proxies'):
+                    self.proxies.extend(Proxy(entity, kind, rect) for kind, rect in entity.proxies())
+
+            self.members = present
+            self.unindexed = [entity for entity in entities if not hasattr(entity, 'proxies')]
+            self.axis = self.choose_axis()
+
+        if self.axis == 'x':
+            self.proxies.sort(key=lambda proxy: proxy.rect.x)
+        else:
+            self.proxies.sort(key=lambda proxy: proxy.rect.y)
+
+        self.sweep()
+
+    """
+    Method choose_axis(): Returns the axis along which the rectangles are most spread out.
+    """
+    def choose_axis(self):
+        if len(self.proxies) < 2:
+            return self.axis
+
+        xs = [proxy.rect.x for proxy in self.proxies]
+        ys = [proxy.rect.y for proxy in self.proxies]
+
+        return 'x' if max(xs) - min(xs) >= max(ys) - min(ys) else 'y'
+
+    def sweep(self):
+        proxies = self.proxies
+        candidates = self.candidates
+        along_x = self.axis == 'x'
+
+        for pairs in candidates.values():
+            pairs.clear()
+
+        for i, a in enumerate(proxies):
+            ra = a.rect
+            end = ra.x + ra.w if along_x else ra.y + ra.h
+
+            for j in range(i + 1, len(proxies)):
+                b = proxies[j]
+                rb = b.rect
+
+                # Everything after this starts past the end of 'a'
+                if (rb.x if along_x else rb.y) >= end:
+                    break
+
+                if a.owner is b.owner or not (ra.x + ra.w > rb.x and ra.x < rb.x + rb.w and ra.y + ra.h > rb.y and ra.y < rb.y + rb.h):
+                    continue
+
+                if (pairs := candidates.get((a.kind, b.kind))) is not None:
+                    pairs.append((a.owner, b.owner))
+                elif (pairs := candidates.get((b.kind, a.kind))) is not None:
+                    pairs.append((b.owner, a.owner))
@@ -18,6 +18,9 @@ class Button(Rectangle):
         self.framerate = 0
         self.framerate_limit = 1
 
+        self.drawn = None # Image as last drawn by the menu, and the area it covered (see Menu.render_changes())
+        self.drawn_area = None
+
     def update(self, menu, game):
         key = pygame.key.get_pressed()
 
@@ -67,4 +70,7 @@ class Button(Rectangle):
             self.image = self.static
 
     def render(self, screen, offset=(0,0)):
-        screen.blit(self.image, (self.x - offset[0], self.y - offset[1]))
\ No newline at end of file
+        self.drawn = self.image
+        self.drawn_area = screen.blit(self.image, (self.x - offset[0], self.y - offset[1]))
+
+        return self.drawn_area
\ No newline at end of file
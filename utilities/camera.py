@@ -1,3 +1,6 @@
+# Standard
+import math
+
 # Local
 from utilities.shapes import Rectangle
 
@@ -12,8 +15,11 @@ class Camera:
         self.h = size[1]
         self.view = []
 
-    def update(self, quadtree, offset):
-        self.view = quadtree.hit( Rectangle(offset, (self.w, self.h)) )
+    # Finds the pre-drawn chunks of tiles (see TileChunks), or of the pieces of an image (see ImageChunks), that are in view
+    def update(self, chunks, offset):
+        self.view = chunks.visible( Rectangle(offset, (self.w, self.h)) )
 
+    # Chunks are placed on whole pixels, rounded down (a blit would round towards zero instead, so that the chunks on either side of
+    # the screen's edge could overlap by a pixel)
     def render(self, screen, offset=(0,0)):
-        screen.fblits(((tile.image, (tile.x - offset[0], tile.y- offset[1])) for tile in self.view))
\ No newline at end of file
+        screen.fblits(((image, (math.floor(x - offset[0]), math.floor(y - offset[1]))) for image, (x, y) in self.view))
\ No newline at end of file
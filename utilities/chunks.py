@@ -0,0 +1,196 @@
+# Standard
+import math
+from threading import Lock
+
+# 3rd party
+import pygame
+
+# Local
+from .spritecache import SpriteCache
+from .decoder import ImageDecoder
+
+"""
+Class TileChunks(): Draws the tiles of a TileGrid onto a few large surfaces ('chunks', each covering a fixed
+number of pixels) ahead of time, since tiles never move. Rendering the visible part of a level is then a
+handful of large blits instead of one small blit per tile.
+
+A chunk is baked again the next time it is needed after one of its tiles has changed (see TileGrid.set), or after
+it was evicted. Chunks may be baked on a background thread (see WorldStream).
+"""
+class TileChunks:
+    TRANSPARENT = (255, 0, 255) # Colour key of the empty parts of a chunk
+
+    def __init__(self, grid, chunk_size=(256, 256)):
+        self.grid = grid
+        self.w, self.h = chunk_size
+
+        # Size of a chunk in cells
+        self.columns = self.w // grid.tile_w
+        self.rows = self.h // grid.tile_h
+
+        self.surfaces = {} # (chunk column, chunk row) -> Surface, or None if the chunk has no tiles
+        self.lock = Lock() # Held while the surfaces change
+
+    """
+    Method bake_key(): Bakes one chunk, unless it is baked already, and returns its surface.
+    """
+    def bake_key(self, key):
+        with self.lock:
+            if key not in self.surfaces:
+                self.surfaces[key] = self.bake_chunk(*key)
+
+            return self.surfaces[key]
+
+    def bake_chunk(self, chunk_column, chunk_row):
+        grid = self.grid
+        first_column, first_row = chunk_column * self.columns, chunk_row * self.rows
+
+        blits = []
+        for row in range(first_row, min(first_row + self.rows, grid.rows)):
+            start = row * grid.columns
+            for column in range(first_column, min(first_column + self.columns, grid.columns)):
+                if (id := grid.cells[start + column]):
+                    blits.append((grid.image_lookup(id), ((column - first_column) * grid.tile_w, (row - first_row) * grid.tile_h)))
+
+        if not blits:
+            return None
+
+        surface = pygame.Surface((self.w, self.h))
+        surface.fill(self.TRANSPARENT)
+        surface.fblits(blits)
+        surface.set_colorkey(self.TRANSPARENT, pygame.RLEACCEL)
+
+        return surface
+
+    """
+    Method refresh(): Forgets the chunks whose tiles have changed since the last refresh.
+    """
+    def refresh(self):
+        grid = self.grid
+        if not grid.changed:
+            return
+
+        with self.lock:
+            while grid.changed:
+                index = grid.changed.pop()
+                self.surfaces.pop(((index % grid.columns) // self.columns, (index // grid.columns) // self.rows), None)
+
+    """
+    Method evict(): Forgets the surfaces of all chunks that are not in 'keep'.
+    """
+    def evict(self, keep):
+        with self.lock:
+            for key in [key for key in self.surfaces if key not in keep]:
+                del self.surfaces[key]
+
+    """
+    Method last_chunk(): Returns the column and row of the bottom right chunk.
+    """
+    def last_chunk(self):
+        return (self.grid.columns - 1) // self.columns, (self.grid.rows - 1) // self.rows
+
+    """
+    Method bounds(): Returns the first and last column and row of the chunks that can have a surface.
+    """
+    def bounds(self):
+        return (0, 0, *self.last_chunk())
+
+    """
+    Method visible(): Returns the chunks that overlap 'rect', as a list of (surface, position) pairs.
+    Chunks that have not been baked yet are baked first.
+    """
+    def visible(self, rect):
+        self.refresh()
+
+        grid = self.grid
+        first_column, first_row, last_column, last_row = self.bounds()
+
+        c0 = max(int((rect.x - grid.x) // self.w), first_column)
+        c1 = int((rect.x + rect.w - grid.x) // self.w)
+        r0 = max(int((rect.y - grid.y) // self.h), first_row)
+        r1 = int((rect.y + rect.h - grid.y) // self.h)
+
+        chunks = []
+        for row in range(r0, min(r1, last_row) + 1):
+            for column in range(c0, min(c1, last_column) + 1):
+                if (surface := self.surfaces.get((column, row), False)) is False:
+                    surface = self.bake_key((column, row))
+
+                if surface:
+                    chunks.append((surface, (grid.x + column * self.w, grid.y + row * self.h)))
+
+        return chunks
+
+
+"""
+Class ImageChunks(): A large image of a level (its background or foreground) cut into pieces along the chunks of a
+TileChunks, so that it is streamed in and out with the tiles (see WorldStream) instead of being kept in memory whole.
+
+The pieces are cut only once and kept on disk (see SpriteCache.sheet()); after that, a piece is only read from the
+cache file when its chunk is baked, and forgotten again when the chunk is evicted. Since the image may reach a little
+past the level, pieces outside of the level's chunks are kept and dropped with the nearest chunk of the level.
+"""
+class ImageChunks(TileChunks):
+    def __init__(self, chunks, position, size):
+        TileChunks.__init__(self, chunks.grid, (chunks.w, chunks.h))
+        self.level_chunks = chunks
+
+        self.x, self.y = position # Top left corner of the image in the level
+        self.image_w, self.image_h = size
+
+        # Chunks that the image overlaps
+        grid = self.grid
+        self.first_column = math.floor((self.x - grid.x) / self.w)
+        self.first_row = math.floor((self.y - grid.y) / self.h)
+        self.last_column = math.ceil((self.x + self.image_w - grid.x) / self.w) - 1
+        self.last_row = math.ceil((self.y + self.image_h - grid.y) / self.h) - 1
+
+        self.variant = ('pieces', (self.w, self.h), (self.x - grid.x, self.y - grid.y)) # What the pieces are cut for (see SpriteCache)
+        self.pieces = None # The cut pieces, one per chunk row by row (see open())
+
+    """
+    Method open(): Opens the cached pieces of the image at 'path', cutting them from the image first if they are not
+    cached yet (which decodes the whole image, once). Raises the same errors as pygame.image.load().
+    """
+    def open(self, path):
+        self.pieces = SpriteCache.shared().sheet(path, self.variant, lambda: self.cut(ImageDecoder.shared().load(path)))
+
+    def cut(self, image):
+        return [image.subsurface(self.piece(column, row)).copy() for row in range(self.first_row, self.last_row + 1)
+                                                                 for column in range(self.first_column, self.last_column + 1)]
+
+    # Part of the image (in its own coordinates) that lies in a chunk
+    def piece(self, column, row):
+        left = max(self.grid.x + column * self.w, self.x)
+        top = max(self.grid.y + row * self.h, self.y)
+        right = min(self.grid.x + (column + 1) * self.w, self.x + self.image_w)
+        bottom = min(self.grid.y + (row + 1) * self.h, self.y + self.image_h)
+
+        return pygame.Rect(left - self.x, top - self.y, right - left, bottom - top)
+
+    def bake_chunk(self, column, row):
+        if not (self.first_column <= column <= self.last_column and self.first_row <= row <= self.last_row):
+            return None
+
+        index = (row - self.first_row) * (self.last_column - self.first_column + 1) + column - self.first_column
+        return self.pieces[index]
+
+    def refresh(self):
+        pass # The image never changes
+
+    def evict(self, keep):
+        last_column, last_row = self.level_chunks.last_chunk()
+
+        with self.lock:
+            for key in [key for key in self.surfaces if (min(max(key[0], 0), last_column), min(max(key[1], 0), last_row)) not in keep]:
+                del self.surfaces[key]
+
+    def bounds(self):
+        return self.first_column, self.first_row, self.last_column, self.last_row
+
+    """
+    Method visible(): Like TileChunks.visible(), but a piece does not fill its whole chunk where it is at the edge of
+    the image, so it is placed at the top left corner of the part of the image that it holds.
+    """
+    def visible(self, rect):
+        return [(surface, (max(x, self.x), max(y, self.y))) for surface, (x, y) in TileChunks.visible(self, rect)]
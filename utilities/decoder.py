@@ -0,0 +1,162 @@
+# Standard
+import os
+import atexit
+import multiprocessing
+from threading import Lock
+from multiprocessing.shared_memory import SharedMemory
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# 3rd party
+import pygame
+
+# Local
+from .spritecache import SpriteCache
+
+"""
+Function decode(): Runs in a worker process. Decodes the image at 'path' into a new block of shared memory, as BGRA
+pixels (the pixel format of convert_alpha(); parts made transparent by a colour key get an alpha of 0), and returns
+the size of the image and the name of the block. The block is freed by the process that reads it.
+"""
+def decode(path):
+    image = pygame.image.load(path)
+
+    if image.get_colorkey() is not None:
+        rgba = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+        rgba.blit(image, (0, 0))
+        image = rgba
+
+    pixels = pygame.image.tobytes(image, 'BGRA')
+
+    memory = SharedMemory(create=True, size=max(len(pixels), 1))
+    memory.buf[:len(pixels)] = pixels
+
+    name = memory.name
+    memory.close()
+
+    return image.get_size(), name
+
+# Frees the shared memory that a finished decode() has decoded an image into, for an image that is not going to be loaded
+def free(future):
+    if future.cancelled() or future.exception():
+        return
+
+    try:
+        memory = SharedMemory(future.result()[1])
+    except OSError:
+        return # Freed already
+
+    memory.close()
+    memory.unlink()
+
+
+"""
+Class ImageDecoder(): Decodes images (PNG files) in a pool of worker processes, so that many images are decoded at
+once on as many cores, and the loading thread only waits (leaving the rest of the game, e.g. the loading screen,
+free to run). Only the Surface is made in this process, from the decoded pixels, and converted with convert_alpha().
+
+Images are queued with prefetch() as early as they are known, and picked up with load(). Images that were queued but
+are not going to be loaded (e.g. those of a level that was dropped) are given up with discard(), which frees their
+shared memory; whatever is still outstanding when the game exits is freed by close(). If the worker processes cannot
+be used, images are decoded here instead.
+"""
+class ImageDecoder:
+    shared_decoder = None
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None # Started the first time an image is decoded
+        self.pending = {} # Path -> Future of decode()
+        self.broken = False
+        self.lock = Lock() # Images are loaded from more than one thread
+
+    """
+    Method shared(): Returns the image decoder used by the whole game.
+    """
+    @classmethod
+    def shared(cls):
+        if not cls.shared_decoder:
+            cls.shared_decoder = cls()
+            atexit.register(cls.shared_decoder.close)
+
+        return cls.shared_decoder
+
+    """
+    Method prefetch(): Starts decoding the images at 'paths' in the worker processes.
+    """
+    def prefetch(self, paths):
+        if self.broken or not paths or self.workers < 2: # With a single core, images are decoded here, as it saves the copying
+            return
+
+        with self.lock:
+            try:
+                if not self.pool:
+                    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1') # Keeps the workers from greeting on import
+                    self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+                for path in paths:
+                    if path not in self.pending:
+                        self.pending[path] = self.pool.submit(decode, path)
+            except (OSError, RuntimeError, BrokenProcessPool):
+                self.broken = True
+
+    """
+    Method load(): Returns the image at 'path' as a Surface converted with convert_alpha(), decoded by a worker process
+    if possible. Raises the same errors as pygame.image.load().
+    """
+    def load(self, path):
+        if path not in self.pending:
+            self.prefetch([path])
+
+        with self.lock:
+            future = self.pending.pop(path, None)
+
+        if future:
+            try:
+                size, name = future.result()
+            except BrokenProcessPool:
+                self.broken = True
+            else:
+                return self.receive(size, name)
+
+        return pygame.image.load(path).convert_alpha()
+
+    """
+    Method discard(): Gives up the images at 'paths' that were queued by prefetch() but not loaded, and frees the
+    memory they were decoded into (once they are decoded, if they are still being decoded).
+    """
+    def discard(self, paths):
+        with self.lock:
+            futures = [future for path in paths if (future := self.pending.pop(path, None))]
+
+        for future in futures:
+            future.add_done_callback(free)
+
+    """
+    Method close(): Frees the images that are still outstanding and stops the worker processes.
+    """
+    def close(self):
+        self.discard(list(self.pending))
+
+        if self.pool:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+
+    # Makes a Surface out of the pixels that a worker process has decoded into shared memory, and frees the memory
+    def receive(self, size, name):
+        memory = SharedMemory(name)
+
+        try:
+            pixels = memory.buf[:size[0] * size[1] * 4]
+            decoded = pygame.image.frombuffer(pixels, size, 'BGRA')
+
+            # The pixels are already in the format of convert_alpha() (see decode()) where the display allows, so they are only copied
+            image = decoded.copy() if decoded.get_masks() == SpriteCache.shared().display_masks() else decoded.convert_alpha()
+
+            del decoded
+            pixels.release()
+        finally:
+            memory.close()
+            memory.unlink()
+
+        return image
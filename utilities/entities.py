@@ -116,7 +116,12 @@ class Player(Rectangle, Physics, EntityAnimation):
 
         self.door = Rectangle((1918, 169), (20, 32))
 
-    def update(self, dt, static, game):
+    # Rectangles that other entities can interact with (see EntityManager.interact)
+    def proxies(self):
+        return (('body', self), ('attack', self.attack_region))
+
+    # Everything that happens before the physics step (see Physics.update)
+    def before_physics(self, dt, static, game):
 
         # mouse and keyboard
         self.input(game)
@@ -129,10 +134,13 @@ class Player(Rectangle, Physics, EntityAnimation):
             self.dx = 0
             self.dy = 0
 
-        # physics and collision
-        for _ in range(10):
-            self.update_verlet(dt, (self.dx, self.dy))
+        # force used by the physics step
+        self.force = (self.dx, self.dy)
+
+    # Everything that happens after the physics step (see Physics.update)
+    def after_physics(self, dt, static, game):
 
+        # collision
         self.check_collision(static)
 
         # Performs a certain function depending on collision type
@@ -188,8 +196,20 @@ class Player(Rectangle, Physics, EntityAnimation):
         
         return self.is_alive
 
+    # Hurts the player (by 'damage' health), unless they were hurt a moment ago (see grace period)
+    def take_hit(self, game, damage):
+        if self.grace_period == False:
+            if self.health > 0:
+                game.screen_shake = 25
+                game.hurt = 15
+                self.health -= damage
+            else:
+                self.health = 0
+            self.reset_velocity()
+            self.grace_period = True
+
     def input(self, game):
-        key = pygame.key.get_pressed() # Keyboard input
+        key = game.controls.keys # Keyboard input
 
         if key[pygame.K_a]:
             self.dx -= 6
@@ -215,8 +235,8 @@ class Player(Rectangle, Physics, EntityAnimation):
         #    if self.interact:
         #        self.interact = False
 
-        mouse = pygame.mouse.get_pressed() # Mouse input
-        mouse_pos = pygame.mouse.get_pos() # Position of the mouse cursor
+        mouse = game.controls.buttons # Mouse input
+        mouse_pos = game.controls.position # Position of the mouse cursor
 
         if not game.button_cooldown:
             if mouse[0]:
@@ -250,30 +270,32 @@ class Remnant(Rectangle, Physics, EntityAnimation):
         self.velx = 0
 
         self.view = Rectangle((self.x + self.w / 2 - (self.w * 10) / 2, self.y), (self.w * 10, self.h))
-        self.bullets = []
 
-    def update(self, dt, static, game):
-        player = game.LEVEL_INFO.entities.retr_player()
+        self.BULLET_SPEED = 180 # Pixels per second
+        self.RELOAD = 45 # Updates between shots
+        self.reload = 0
+
+    # Rectangles that other entities can interact with (see EntityManager.interact)
+    def proxies(self):
+        return (('body', self), ('view', self.view))
 
+    # Everything that happens before the physics step (see Physics.update)
+    def before_physics(self, dt, static, game):
         # Applies force to axes
         self.input()
 
         # Movement direction
         if self.dx != 0: self.reverse_direction(static)
 
-        # Tracks player attack as well as the collision between this entity and the player
-        self.player_collision(player, game)
+        # Force used by the physics step (~gravity is added to it)
+        self.force = (self.dx, self.dy)
 
-        """
-        for i, bullet in enumerate(self.bullets):
-            if bullet.collide(player):
-                player.health -= 20
-                # maybe create a manager for them instead?
-        """
+    # Everything that happens after the physics step (see Physics.update)
+    def after_physics(self, dt, static, game):
+        player = game.LEVEL_INFO.entities.retr_player()
 
-        # Physics (~gravity)
-        for _ in range(10):
-            self.update_verlet(dt, (self.dx, self.dy))
+        if self.reload > 0:
+            self.reload -= 1
 
         # Collision
         self.check_collision(static)
@@ -300,17 +322,8 @@ class Remnant(Rectangle, Physics, EntityAnimation):
         if self.imminent_death == True and player.fIndex >= len(player.assets['attack'][0]) // 4:
             self.is_alive = False
 
-            # Spawns an 'total' amount of particles where this entity dies
-            particles = []
-            total = 20
-
-            for _ in range(total):
-                w = h = random.randint(3, 6)
-                image = pygame.Surface((w, h))
-                image.fill((185,185,185))
-                particles.append(Blood(image, (self.x+self.w/2, self.y+self.h/2), (w, h)))
-
-            game.LEVEL_INFO.entities.add_multiple(particles)
+            # Spawns particles where this entity dies
+            game.LEVEL_INFO.particles.emit((self.x + self.w / 2, self.y + self.h / 2), 20)
 
         # Quite self-explanatory - this entity is terminated if it isn't alive
         return self.is_alive
@@ -322,82 +335,30 @@ class Remnant(Rectangle, Physics, EntityAnimation):
         if self.lookout(static, self.flipped):
             self.flipped = False if self.flipped else True
             
-    def player_collision(self, player, game):
-        if self.view.collide(player):
-            self.flipped = False if player.x >= self.x else True
-            self.bullets.append(Bullet((self.x if self.flipped else self.x + self.w, self.y + self.h / 2), (2, 1), self.flipped))
-
-        if player.grace_period == False:
-            if self.collide(player):
-                if player.health > 0:
-                    game.screen_shake = 25
-                    game.hurt = 15
-                    player.health -= 20
-                else:
-                    player.health = 0
-                player.reset_velocity()
-                player.grace_period = True
-
-        if player.attack == True:
-            if self.collide(player.attack_region):
-                self.imminent_death = True
-                self.health -= 20
-                
-
-class Bullet(Rectangle):
-    def __init__(self, position, size, direction):
-        Rectangle.__init__(self, position, size)
-
-        self.vel = 3 if direction else -3
-
-    def update(self):
-        self.x += self.x
-
-class Blood(Rectangle, Physics):
-    def __init__(self, image, position, size, assets=None):
-        Rectangle.__init__(self, position, size)
-        Physics.__init__(self, position)
-
-        self.image = image
-        self.assets = assets
-        self.local_offset = [0, 0]
-
-        self.is_alive = 1
-
-        self.dx = 0
-        self.dy = 0
-
-        self.initial_impact = True
-
-        self.time = random.randint(20, 35)
-        self.decay = random.randint(36, 64)
-
-    def update(self, dt, static, game):
-        # applies force of initial impact
-        if self.initial_impact:
-            self.dx = (random.randint(0, 42) / 6 - 3.5) / dt
-            self.dy = (random.randint(0, 42) / 6 - 3.5) / dt
-            self.initial_impact = False
+    # Tracks player attack as well as the collision between this entity and the player.
+    # Called by the entity manager for every rectangle of the player that overlaps one of this entity's rectangles.
+    def encounter(self, kind, other, other_kind, game):
+        player = game.LEVEL_INFO.entities.retr_player()
+        if other is not player:
+            return
 
-        # physics
-        for _ in range(10):
-            self.update_verlet(dt, (self.dx, self.dy), False)
-        
-        # collision
-        self.check_collision(static)
+        if kind == 'view' and other_kind == 'body':
+            self.flipped = False if player.x >= self.x else True
 
-        # timepspan decay
-        self.time = self.time - dt * 10
+            # Shoots at the player (see Projectiles), as often as it has reloaded
+            if self.reload == 0:
+                velocity = (-self.BULLET_SPEED if self.flipped else self.BULLET_SPEED, 0)
+                if game.LEVEL_INFO.projectiles.fire((self.x if self.flipped else self.x + self.w, self.y + self.h / 2), velocity):
+                    self.reload = self.RELOAD
 
-        # timeout means death
-        if self.time <= 0:
-            self.is_alive = False
+        elif kind == 'body' and other_kind == 'body':
+            player.take_hit(game, 20)
 
-        # reset force on both axes
-        self.dx, self.dy = 0,0
-        
-        # alive or dead
-        return self.is_alive
+        elif kind == 'body' and other_kind == 'attack':
+            if player.attack == True:
+                self.imminent_death = True
+                self.health -= 20
+                
 
 class Tile(Rectangle):
     def __init__(self, image, position, size, id=None):
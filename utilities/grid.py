@@ -0,0 +1,166 @@
+# Standard
+import math
+from array import array
+
+# Local
+from .entities import Tile
+
+"""
+Class TileGrid(): Stores the tiles of a level as one compact array of tile ids (row by row), together
+with the position of the level's top left corner. Since every tile sits on the same fixed grid, the tiles that
+overlap a rectangle are found with integer arithmetic instead of a tree search, and only those cells are visited.
+
+Tile objects are only created (and then kept) for cells that are actually looked up.
+
+For collision, neighbouring cells with one of the 'merge' ids are combined into as few rectangles as possible
+(e.g. a wall becomes one tall rectangle instead of a column of tiles). Every other id keeps one tile per cell.
+"""
+class TileGrid:
+    def __init__(self, rows, origin, tile_size, image_lookup, merge=()):
+        columns = max((len(row) for row in rows), default=0)
+
+        # Tile id of every cell; 0 means empty
+        cells = array('H', bytes(2 * len(rows) * columns))
+        for y, row in enumerate(rows):
+            cells[y * columns : y * columns + len(row)] = array('H', row)
+
+        self.setup(cells, columns, origin, tile_size, image_lookup, merge)
+
+    """
+    Method from_cells(): Creates a grid directly from a flat buffer of tile ids (row by row, e.g. a memoryview of a
+    compiled level, which is used as is and not copied). 'merged' are the collision rectangles of the merged cells as
+    (column, row, width, height, id) if they are known already; otherwise they are merged here.
+    """
+    @classmethod
+    def from_cells(cls, cells, columns, origin, tile_size, image_lookup, merge=(), merged=None):
+        grid = cls.__new__(cls)
+        grid.setup(cells, columns, origin, tile_size, image_lookup, merge, merged)
+
+        return grid
+
+    def setup(self, cells, columns, origin, tile_size, image_lookup, merge, merged=None):
+        self.x, self.y = origin
+        self.tile_w, self.tile_h = tile_size
+        self.image_lookup = image_lookup # Function that returns the image of a tile id
+
+        self.cells = cells # Tile id of every cell; 0 means empty
+        self.columns = columns
+        self.rows = len(cells) // columns if columns else 0
+
+        self.tiles = {} # Cell index -> Tile
+        self.changed = [] # Cells whose tile has changed (see TileChunks.refresh)
+
+        # Collision rectangles made of merged cells, and which of them each cell belongs to (-1 for none)
+        self.merge_ids = merge
+        self.colliders = []
+        self.owners = array('i', [-1]) * len(self.cells)
+
+        if merged is None:
+            self.merge(merge)
+        else:
+            for column, row, width, height, id in merged:
+                self.add_collider(column, row, width, height, id)
+
+    """
+    Method tile(): Returns the tile of a cell, creating it the first time it is requested.
+    """
+    def tile(self, index):
+        if not (tile := self.tiles.get(index, None)):
+            id = self.cells[index]
+            position = (self.x + (index % self.columns) * self.tile_w, self.y + (index // self.columns) * self.tile_h)
+
+            tile = self.tiles[index] = Tile(self.image_lookup(id), position, (self.tile_w, self.tile_h), id)
+
+        return tile
+
+    """
+    Method merge(): Greedily merges cells with the same id (for the given ids) into rectangles. Starting from
+    the top left, each rectangle is first made as wide as possible and then as tall as possible.
+    """
+    def merge(self, ids):
+        cells, owners, columns = self.cells, self.owners, self.columns
+
+        for start, id in enumerate(cells):
+            if id not in ids or owners[start] != -1:
+                continue
+
+            column, row = start % columns, start // columns
+
+            # Grows to the right
+            width = 1
+            while column + width < columns and cells[start + width] == id and owners[start + width] == -1:
+                width += 1
+
+            # Grows downwards, as long as the whole width of the next row matches
+            height = 1
+            while row + height < self.rows:
+                first = start + height * columns
+                if any(cells[n] != id or owners[n] != -1 for n in range(first, first + width)):
+                    break
+                height += 1
+
+            self.add_collider(column, row, width, height, id)
+
+    """
+    Method add_collider(): Adds one collision rectangle of merged cells, and marks the cells it covers as its own.
+    """
+    def add_collider(self, column, row, width, height, id):
+        owner = array('i', [len(self.colliders)]) * width
+        for n in range(height):
+            first = (row + n) * self.columns + column
+            self.owners[first : first + width] = owner
+
+        position = (self.x + column * self.tile_w, self.y + row * self.tile_h)
+        self.colliders.append(Tile(None, position, (width * self.tile_w, height * self.tile_h), id))
+
+    """
+    Method set(): Changes the tile id of a cell (0 removes the tile), and merges the collision rectangles again.
+    """
+    def set(self, column, row, id):
+        index = row * self.columns + column
+
+        self.cells[index] = id
+        self.tiles.pop(index, None)
+        self.changed.append(index)
+
+        self.colliders = []
+        self.owners = array('i', [-1]) * len(self.cells)
+        self.merge(self.merge_ids)
+
+    """
+    Method merge_ratio(): Returns how many merged cells there are per collision rectangle (1 if nothing was merged).
+    """
+    def merge_ratio(self):
+        if not self.colliders:
+            return 1
+
+        return sum(1 for owner in self.owners if owner != -1) / len(self.colliders)
+
+    """
+    Method span(): Returns the range of columns and rows that a rectangle overlaps, clamped to the grid.
+    """
+    def span(self, rect):
+        c0 = max(math.floor((rect.x - self.x) / self.tile_w), 0)
+        c1 = min(math.ceil((rect.x + rect.w - self.x) / self.tile_w), self.columns)
+        r0 = max(math.floor((rect.y - self.y) / self.tile_h), 0)
+        r1 = min(math.ceil((rect.y + rect.h - self.y) / self.tile_h), self.rows)
+
+        return range(c0, c1), range(r0, r1)
+
+    """
+    Method hit(): Returns a set with all the colliders that overlap 'rect': merged rectangles, and tiles for
+    the cells that were not merged.
+    """
+    def hit(self, rect):
+        columns, rows = self.span(rect)
+        cells, owners, colliders = self.cells, self.owners, self.colliders
+
+        hits = set()
+        for row in rows:
+            start = row * self.columns
+            for index in range(start + columns.start, start + columns.stop):
+                if cells[index]:
+                    owner = owners[index]
+                    hits.add(colliders[owner] if owner != -1 else self.tile(index))
+
+        return hits
@@ -0,0 +1,110 @@
+# Standard
+import random
+
+# 3rd party
+import pygame
+
+"""
+Class TextCache(): Keeps rendered text by (text, colour), so that the same text is only rendered (rasterised) once.
+"""
+class TextCache:
+    def __init__(self, font, limit=256):
+        self.font = font
+        self.limit = limit # Texts kept at most; all are dropped when it is reached (e.g. a counter that keeps changing)
+        self.surfaces = {}
+
+    def get(self, text, colour):
+        key = (text, tuple(colour))
+
+        if (surface := self.surfaces.get(key, None)) is None:
+            if len(self.surfaces) >= self.limit:
+                self.surfaces.clear()
+
+            surface = self.surfaces[key] = self.font.render(text, True, colour)
+
+        return surface
+
+
+"""
+Class HealthText(): The health of the player (e.g. 'HP:100'), which darkens and shakes more as the health drops.
+The text is only looked up again when the health changes.
+"""
+class HealthText:
+    def __init__(self, text_cache):
+        self.text_cache = text_cache
+        self.health = None
+        self.image = None
+        self.shake = 0 # Pixels the text shakes by (in both directions)
+        self.visible = True
+
+    def update(self, game):
+        if (health := game.target.health) != self.health:
+            self.health = health
+
+            colour, self.shake = (0,0,0), 0
+            if health > 60:
+                colour = (255,255,255)
+            elif health > 40:
+                colour, self.shake = (155,40,0), 1
+            elif health > 20:
+                colour, self.shake = (139,20,0), 2
+            elif health > 0:
+                colour, self.shake = (139,0,0), 4
+
+            self.image = self.text_cache.get(f'HP:{health}', colour)
+
+        self.position = (5, 0)
+        if self.shake:
+            self.position = tuple(n + random.randint(0, self.shake) - self.shake / 2 for n in self.position)
+
+
+"""
+Class HurtOverlay(): Tints the screen red while the player has just been hurt.
+"""
+class HurtOverlay:
+    def __init__(self, image):
+        self.image = image
+        self.position = (0, 0)
+        self.visible = False
+
+    def update(self, game):
+        self.visible = game.hurt > 0
+
+
+"""
+Class Cursor(): The mouse cursor, drawn at the resolution of the screen where the latest update saw the mouse.
+"""
+class Cursor:
+    def __init__(self):
+        self.image = pygame.Surface((2, 2))
+        self.image.fill((255,255,255))
+        self.position = (0, 0)
+        self.visible = True
+
+    def update(self, game):
+        self.visible = game.run_level_sequence
+
+        mouse_pos = game.controls.position # As read by the latest update (recorded or replayed, see Game.input)
+        self.position = (mouse_pos[0] / game.res_offset[0], mouse_pos[1] / game.res_offset[1])
+
+
+"""
+Class HUD(): The layer drawn over the level (health, cursor, ...). Every widget keeps its own image and only makes it
+again when what it shows changes; the HUD then draws all visible widgets onto the screen at once (in the order they
+were added, the last on top).
+"""
+class HUD:
+    def __init__(self, game):
+        self.text_cache = TextCache(game.FONT)
+
+        self.widgets = [
+            HurtOverlay(game.hurt_indicator),
+            HealthText(self.text_cache),
+            Cursor(),
+        ]
+
+    def render(self, screen, game):
+        for widget in self.widgets:
+            widget.update(game)
+
+        screen.fblits([(widget.image, widget.position) for widget in self.widgets if widget.visible])
@@ -0,0 +1,168 @@
+# Standard
+import os
+import sys
+import json
+import mmap
+import struct
+from array import array
+
+# Local
+from .grid import TileGrid
+
+"""
+Compiled levels. A level directory in world/simplified (data.json, TileGrid.csv and EntityGrid.csv) is compiled
+ahead of time into one binary file, so that loading a level does not have to parse any text:
+
+    header      magic, version, origin, grid size, and the size of each section below
+    metadata    data.json (plus the tile ids that were merged), as UTF-8 JSON
+    tiles       tile id of every cell, row by row (uint16)
+    colliders   merged collision rectangles, (column, row, width, height, id) each (uint32)
+    entities    every non-empty cell of the entity grid, (column, row, id) each (uint32)
+
+All numbers are little-endian, and every section starts on a 4 byte boundary. The file is memory-mapped when it is
+loaded, and the sections are read straight out of the mapping (see LevelFile).
+"""
+
+MAGIC = b'BTSL'
+VERSION = 1
+COMPILED_NAME = 'level.bin' # Name of the compiled file inside a level directory
+SOURCE_NAMES = ('data.json', 'TileGrid.csv', 'EntityGrid.csv')
+MERGED_TILES = (1,) # Tiles that are merged into larger rectangles for collision (the others are triggers and keep one collider per tile)
+
+HEADER = struct.Struct('<4sHxxiiIIIII') # magic, version, x, y, columns, rows, metadata bytes, colliders, entities
+COLLIDER_FIELDS = 5
+ENTITY_FIELDS = 3
+
+
+"""
+Function read_csv(): Reads a grid of integer ids from a CSV file (one row per line; ids may have any number of digits).
+"""
+def read_csv(path):
+    with open(path, 'r') as csv:
+        return [[int(value) for value in row.split(',') if value] for row in csv.read().split('\n')]
+
+def padding(size):
+    return b'\0' * (-size % 4)
+
+"""
+Function compile_level(): Compiles the level in 'directory' and returns the contents of its binary file.
+Cells with one of the 'merge' ids are merged into collision rectangles ahead of time (see TileGrid.merge).
+"""
+def compile_level(directory, merge=()):
+    with open(os.path.join(directory, 'data.json')) as file:
+        data = json.load(file)
+
+    tile_rows = read_csv(os.path.join(directory, 'TileGrid.csv'))
+    entity_rows = read_csv(os.path.join(directory, 'EntityGrid.csv'))
+
+    # The merging only depends on the cells, so it is done on a grid of 1x1 tiles at (0, 0)
+    grid = TileGrid(tile_rows, (0, 0), (1, 1), None, merge)
+    colliders = array('I', [int(value) for tile in grid.colliders for value in (tile.x, tile.y, tile.w, tile.h, tile.id)])
+
+    entities = array('I')
+    for row, values in enumerate(entity_rows):
+        for column, id in enumerate(values):
+            if id:
+                entities.extend((column, row, id))
+
+    metadata = json.dumps({'data' : data, 'merged' : list(merge)}).encode('utf-8')
+
+    tiles, sections = grid.cells, []
+    for section in (tiles, colliders, entities):
+        if sys.byteorder != 'little':
+            section = array(section.typecode, section)
+            section.byteswap()
+        sections.append(section.tobytes())
+
+    header = HEADER.pack(MAGIC, VERSION, data['x'], data['y'], grid.columns, grid.rows, len(metadata),
+                         len(colliders) // COLLIDER_FIELDS, len(entities) // ENTITY_FIELDS)
+
+    return b''.join([header, metadata, padding(len(metadata))] + [section + padding(len(section)) for section in sections])
+
+"""
+Function compiled_path(): Returns the path of the compiled file of a level directory, or None if there is none or if
+it is older than any of the level's source files (then it is out of date and the sources are read instead).
+"""
+def compiled_path(directory):
+    path = os.path.join(directory, COMPILED_NAME)
+
+    try:
+        compiled = os.stat(path).st_mtime
+    except OSError:
+        return None
+
+    for name in SOURCE_NAMES:
+        try:
+            if os.stat(os.path.join(directory, name)).st_mtime > compiled:
+                return None
+        except OSError:
+            pass
+
+    return path
+
+
+"""
+Class LevelFile(): A compiled level, memory-mapped. 'tiles', 'colliders' and 'entities' are memoryviews of the
+mapping itself rather than copies, so opening a level costs about the same however large it is. The mapping is
+copy-on-write: a grid built on 'tiles' can change its cells (see TileGrid.set) without touching the file.
+"""
+class LevelFile:
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        if len(self.buffer) < HEADER.size:
+            raise ValueError(f'{path} is truncated')
+
+        magic, version, x, y, self.columns, self.rows, metadata, colliders, entities = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a compiled level of version {VERSION}')
+
+        self.origin = (x, y)
+
+        view = memoryview(self.buffer)
+        offset = HEADER.size
+
+        info = json.loads(bytes(view[offset : offset + metadata]).decode('utf-8'))
+        self.data = info['data'] # Contents of data.json
+        self.merged_ids = tuple(info['merged'])
+        offset += metadata + len(padding(metadata))
+
+        self.tiles, offset = self.section(view, offset, 'H', self.columns * self.rows)
+        self.colliders, offset = self.section(view, offset, 'I', colliders * COLLIDER_FIELDS)
+        self.entities, offset = self.section(view, offset, 'I', entities * ENTITY_FIELDS)
+
+    # Returns 'length' numbers of the type 'typecode' at 'offset', and the offset of the next section.
+    # Raises ValueError if the file ends before the section does (e.g. a file that was only partly written).
+    def section(self, view, offset, typecode, length):
+        size = length * array(typecode).itemsize
+        if offset + size > len(view):
+            raise ValueError('compiled level is truncated')
+
+        values = view[offset : offset + size].cast(typecode)
+
+        # Big-endian machines get a swapped copy instead
+        if sys.byteorder != 'little':
+            values = array(typecode, values)
+            values.byteswap()
+
+        return values, offset + size + len(padding(size))
+
+    """
+    Method merged(): Returns the merged collision rectangles as (column, row, width, height, id), if they were merged
+    for the same tile ids as 'merge' (otherwise None, and the grid has to merge them itself).
+    """
+    def merged(self, merge):
+        if tuple(merge) != self.merged_ids:
+            return None
+
+        colliders = self.colliders
+        return [tuple(colliders[n : n + COLLIDER_FIELDS]) for n in range(0, len(colliders), COLLIDER_FIELDS)]
+
+    """
+    Method entity_cells(): Yields (column, row, id) for every entity in the level.
+    """
+    def entity_cells(self):
+        entities = self.entities
+        for n in range(0, len(entities), ENTITY_FIELDS):
+            yield entities[n], entities[n + 1], entities[n + 2]
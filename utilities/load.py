@@ -2,22 +2,59 @@
 import os
 import json
 import time
+from queue import Queue
+from threading import Thread, Lock
+from collections import OrderedDict
+from concurrent.futures import Future
 
 #3rd party
 import pygame
 
 # Local
 from utilities.manager import EntityManager
-from utilities.quadtree import QuadTree
-from utilities.entities import Player, Remnant, Tile
+from utilities.grid import TileGrid
+from utilities.chunks import TileChunks, ImageChunks
+from utilities.particles import Particles
+from utilities.projectiles import Projectiles
+from utilities.level import LevelFile, read_csv, compiled_path, MERGED_TILES
+from utilities.streaming import WorldStream
+from utilities.shapes import Rectangle
+from utilities.entities import Player, Remnant
 from utilities.spritesheet import Spritesheet
+from utilities.manifest import Manifest
+from utilities.spritecache import SpriteCache
+from utilities.decoder import ImageDecoder
+from utilities.surfacecache import SurfaceCache
 
 
-class LevelInfo:
-    __cached_assets = {}
+"""
+Class BuiltLevel(): The parts of a level that do not change while it is played (its map data, tile grid and
+chunks, where its entities start, and its background and foreground images), so that they can be kept and used
+again the next time the level is played.
+"""
+class BuiltLevel:
+    def __init__(self, key):
+        self.level, self.side_level = key
+
+        self.map_data = None
+        self.level_file = None # Compiled version of the level (see utilities/level.py), if there is one
+        self.static = None
+        self.chunks = None
+
+        self.player = None # (position, entity id) of the player
+        self.spawns = [] # (position, entity id) of every other entity
+        self.asset_keys = set() # Keys of the images the level uses in the SurfaceCache (pinned while it is played)
+
+        # The background and foreground images, cut into the pieces of the chunks (None if the level has no such image)
+        self.background = None
+        self.foreground = None
+        self.images_loaded = False
+
 
+class LevelInfo:
     def __init__(self):
         self.SHOW_ERRORS = False # Displays all exceptions / errors for the purpose of debugging
+        self.SHOW_STATS = False # Displays statistics about each loaded level
 
         # Main levels
         self.current_level = 0
@@ -29,13 +66,29 @@ class LevelInfo:
 
         self.ROOT_PATH = os.getcwd()
         self.TILE_SIZE = self.GRID_SIZE = (16, 16)
+        self.IMAGE_POSITION = (16, -1) # Where the background and foreground images sit in a level
 
         self.map_data = None
-        self.static = QuadTree
+        self.level_file = None # Compiled version of the current level (see utilities/level.py), if there is one
+        self.static = TileGrid
+        self.chunks = TileChunks
         self.entities = EntityManager
+        self.particles = Particles
+        self.projectiles = Projectiles
+        self.stream = WorldStream
 
         self.interactables = None
 
+        # Levels that have been built, by (level, side level or None), as Futures (see __built_level)
+        self.LEVEL_CACHE_SIZE = 4
+        self.built_levels = OrderedDict()
+        self.built = None # Built level that is being played
+        self.lock = Lock()
+
+        # Builds the levels next to the current one in the background (see __prefetch)
+        self.prefetch_jobs = Queue()
+        self.prefetcher = None
+
         self.background = None
         self.foreground = None
 
@@ -47,6 +100,9 @@ class LevelInfo:
             5 : (204,204,0) # Bounce
         }
 
+        # Tiles that are merged into larger rectangles for collision (the same as in compiled levels, see compile_world.py)
+        self.MERGED_TILES = MERGED_TILES
+
         self.ENTITY_DATA = {
             1 : {
                 'class' : Player,
@@ -82,134 +138,314 @@ class LevelInfo:
         if self.current_level >= self.MAX_LEVEL:
             return
         
-        self.__data()
+        # Ends the streaming of the previous level
+        if isinstance(self.stream, WorldStream):
+            self.stream.stop()
+
+        # The parts of the level that never change are kept from earlier visits or built ahead of time (see __prefetch)
+        built, cached = self.__built_level((self.current_level, self.current_side_level if self.side_level else None))
+
+        # The images of the level being played are never dropped from the cache
+        SurfaceCache.shared().pin(built.asset_keys)
+        if self.built:
+            SurfaceCache.shared().unpin(self.built.asset_keys)
+
+        if self.SHOW_STATS == True:
+            print(f'Level {self.current_level}: surface cache {SurfaceCache.shared().stats()}')
+
+        self.built = built
+        self.map_data = built.map_data
+        self.level_file = built.level_file
+        self.static = built.static
+        self.chunks = built.chunks
         progress.put(20) # 20%
-        
-        self.__tiles()
+
+        # The background and foreground images are opened before the level starts (levels built ahead of time have them already),
+        # so that they are streamed in with the tiles from the first frame on
+        if not built.images_loaded:
+            self.__images(built)
+        self.background, self.foreground = built.background, built.foreground
         progress.put(40) # 40%
 
-        self.__background()
-        progress.put(60) # 60%
+        # Randomness is seeded from here on when the input of the level is recorded or replayed (see utilities/replay.py)
+        if game.session:
+            game.session.begin(game)
 
-        self.__entities()
+        self.__entities(built)
         game.target = self.entities.retr_player()
         game.offset = [[game.target.x + game.target.w / 2, game.target.y + game.target.h / 2][n] - game.res_screen[n] / [2, 1.8][n] for n in range(2)]
+        game.previous_offset = game.offset
+        progress.put(60) # 60%
+
+        # Activates the part of the level around the player (the rest is streamed in as the camera moves, see WorldStream)
+        self.stream.update(Rectangle(game.offset, game.res_screen), self.entities)
         progress.put(80) # 80%
 
-        self.__foreground()
+        # The levels next to this one are built while this one is played
+        self.__prefetch(self.current_level + 1)
+        self.__prefetch(self.current_level - 1)
         progress.put(100) # 100%
 
         game.run_level_sequence = True
 
-        time.sleep(1)
+        if not game.headless and not cached:
+            time.sleep(1) # Gives the loading screen time to be seen
         return
 
-    def __data(self):
-        with open(f'world/simplified/Level_{self.current_level}' + '/data.json') as map_data:
-            self.map_data = json.load(map_data)
+    # Returns the built level for 'key' (level, side level or None), and whether it was cached (or already being built).
+    # Recently built levels are kept, up to LEVEL_CACHE_SIZE of them; the least recently used are dropped first.
+    def __built_level(self, key):
+        with self.lock:
+            future = self.built_levels.get(key, None)
+            cached = future is not None
+
+            if not cached:
+                future = self.built_levels[key] = Future()
+            self.built_levels.move_to_end(key)
+            self.__trim()
+
+        if not cached:
+            self.__build(future, key)
+
+        return future.result(), cached
+
+    # Starts building a main level on the background thread, unless it is built (or being built) already
+    def __prefetch(self, level):
+        if not 0 <= level < self.MAX_LEVEL:
+            return
+
+        key = (level, None)
+        with self.lock:
+            if key in self.built_levels:
+                return
+
+            future = self.built_levels[key] = Future()
+            self.__trim()
+
+        if not self.prefetcher:
+            self.prefetcher = Thread(target=self.__prefetch_work, daemon=True)
+            self.prefetcher.start()
+
+        self.prefetch_jobs.put((future, key))
+
+    # Drops the least recently used levels beyond LEVEL_CACHE_SIZE (which keeps at least 3: the current level and its neighbours),
+    # and gives up their images if they were still being decoded
+    def __trim(self):
+        while len(self.built_levels) > max(self.LEVEL_CACHE_SIZE, 3):
+            (level, _), _ = self.built_levels.popitem(last=False)
+            ImageDecoder.shared().discard(self.__image_paths(level))
+
+    def __prefetch_work(self):
+        while True:
+            future, key = self.prefetch_jobs.get()
+            self.__build(future, key, images=True)
+
+    # Builds a level into 'future'. A level that fails to build is not kept, so that it is tried again the next time.
+    def __build(self, future, key, images=False):
+        try:
+            built = BuiltLevel(key)
+            self.__data(built)
+            self.__tiles(built)
+            self.__entity_spawns(built)
+            if images:
+                self.__images(built)
+
+            future.set_result(built)
+        except BaseException as error:
+            with self.lock:
+                if self.built_levels.get(key, None) is future:
+                    del self.built_levels[key]
+
+            future.set_exception(error)
+
+    # Opens the compiled file of a level directory (see compile_world.py), or returns None if it has to be read from its CSV files
+    def __compiled(self, directory):
+        if (path := compiled_path(directory)):
+            try:
+                return LevelFile(path)
+            except (OSError, ValueError):
+                if self.SHOW_ERRORS == True:
+                    print(f'Could not read {path}, reading the CSV files instead')
+
+        return None
+
+    def __data(self, built):
+        directory = f'world/simplified/Level_{built.level}'
+
+        if (level_file := self.__compiled(directory)):
+            built.level_file = level_file
+            built.map_data = level_file.data
+            return
+
+        with open(directory + '/data.json') as map_data:
+            built.map_data = json.load(map_data)
 
-    def __tiles(self):
+    def __tiles(self, built):
         # Determines whether to load main level or a side level inside the current main level
-        if self.side_level != True:
-            with open(f'world/simplified/Level_{self.current_level}' + '/TileGrid.csv', 'r') as csv:
-                intGrid = [[int(value) for value in row if value != ','] for row in csv.read().split('\n')]
+        if built.side_level is None:
+            directory = f'world/simplified/Level_{built.level}'
+            level_file = built.level_file
+        else:
+            directory = f'world/simplified/Level_{built.level}_{built.side_level}'
+            level_file = self.__compiled(directory)
+
+        # Tiles are looked up through a grid of tile ids; their images are only fetched when a tile is first needed
+        origin = (built.map_data['x'], built.map_data['y'])
+        image_lookup = lambda id: self.__cached_lookup(self.TILE_SIZE, self.COLOURS[id])
+
+        if level_file:
+            built.static = TileGrid.from_cells(level_file.tiles, level_file.columns, origin, self.TILE_SIZE, image_lookup, self.MERGED_TILES, level_file.merged(self.MERGED_TILES))
         else:
-            with open(f'world/simplified/Level_{self.current_level}_{self.current_side_level}' + '/TileGrid.csv', 'r') as csv:
-                intGrid = [[int(value) for value in row if value != ','] for row in csv.read().split('\n')]
+            built.static = TileGrid(read_csv(directory + '/TileGrid.csv'), origin, self.TILE_SIZE, image_lookup, self.MERGED_TILES)
+
+        if self.SHOW_STATS == True:
+            print(f'Level {built.level}: {len(built.static.colliders)} merged colliders, merge ratio {built.static.merge_ratio():.2f}')
 
-        tiles = []
-        for y, row in enumerate(intGrid):
-            for x, value in enumerate(row):
+        # Draws the tiles onto large surfaces, for levels without a foreground image (only near the camera, see WorldStream)
+        built.chunks = TileChunks(built.static)
+
+    # Finds where the entities of a level start, and loads their images
+    def __entity_spawns(self, built):
+        if built.level_file:
+            cells = built.level_file.entity_cells()
+        else:
+            intGrid = read_csv(f'world/simplified/Level_{built.level}' + '/EntityGrid.csv')
+            cells = ((x, y, value) for y, row in enumerate(intGrid) for x, value in enumerate(row) if value != 0)
 
-                if value != 0:
-                    image = self.__cached_lookup(self.TILE_SIZE, self.COLOURS[value])
-                    position = (self.map_data['x'] + x * self.TILE_SIZE[0], self.map_data['y'] + y * self.TILE_SIZE[1])
+        for x, y, value in cells:
+            entity_data = self.ENTITY_DATA[value]
+            position = (built.map_data['x'] + x * self.GRID_SIZE[0], built.map_data['y'] + y * self.GRID_SIZE[1] - entity_data['size'][1])
 
-                    tiles.append(Tile(image, position, self.TILE_SIZE, value))
+            if value == 1:
+                built.player = (position, value)
+            else:
+                built.spawns.append((position, value))
 
-        self.static = QuadTree(tiles)
+        for value in {value for _, value in built.spawns} | ({built.player[1]} if built.player else set()):
+            self.__entity_assets(self.ENTITY_DATA[value])
+            built.asset_keys.add(self.__asset_key(self.ENTITY_DATA[value]))
 
-    def __entities(self):
-        with open(f'world/simplified/Level_{self.current_level}' + '/EntityGrid.csv', 'r') as csv:
-            intGrid = [[int(value) for value in row if value != ','] for row in csv.read().split('\n')]
+        built.asset_keys.update(('colour', self.TILE_SIZE, colour) for colour in self.COLOURS.values())
 
+    def __entities(self, built):
         self.entities = EntityManager()
+        self.particles = Particles()
+        self.projectiles = Projectiles()
+        self.stream = WorldStream(self.chunks, self.__spawn, layers=[layer for layer in (self.background, self.foreground) if layer])
 
-        player, entities = None, []
-        for y, row in enumerate(intGrid):
-            for x, value in enumerate(row):
-                
-                if value != 0:
-                    entity_data = self.ENTITY_DATA[value]
-                    
-                    position = (self.map_data['x'] + x * self.GRID_SIZE[0], self.map_data['y'] + y * self.GRID_SIZE[1] - entity_data['size'][1])
-                    
-                    if entity_data['visual']:
-                        assets = self.__cached_lookup(entity_data['size'], entity_data['asset'], entity_data['visual'], entity_data['fSize'])
-                    else:
-                        assets = self.__cached_lookup(entity_data['size'], entity_data['colour'])
-
-                    if not entity_data['visual']:
-                        info = [assets, position, entity_data['size']]
-                    else:
-                        image = assets['run'][0][0]
-                        info = [image, position, entity_data['size'], assets]
-
-                    if value == 1:
-                        player = entity_data['class'](*info)
-                    else:
-                        entities.append(entity_data['class'](*info))
-
-        if player: self.entities.add(player)
-        self.entities.add_multiple(entities)
-
-    def __background(self):
-        try:
-            self.background = pygame.image.load(f'images/background/Level_{self.current_level}/thigh.png').convert_alpha()
-        except:
-            self.background = None
-            if self.SHOW_ERRORS == True:
-                print(f'No background found for level {self.current_level}')
+        # The player is created right away; every other entity once its part of the level is streamed in
+        if built.player:
+            self.entities.add_player(self.__spawn(*built.player))
 
-    def __foreground(self):
-        try:
-            self.foreground = pygame.image.load(f'images/foreground/Level_{self.current_level}/thig.png').convert_alpha()
-        except:
-            self.foreground = None
-            if self.SHOW_ERRORS == True:
-                print(f'No foreground found for level {self.current_level}')
+        for position, value in built.spawns:
+            self.stream.add_spawn(position, value)
+
+    # Creates the entity with the given entity id at 'position'
+    def __spawn(self, position, value):
+        entity_data = self.ENTITY_DATA[value]
+        assets = self.__entity_assets(entity_data)
+
+        if not entity_data['visual']:
+            info = [assets, position, entity_data['size']]
+        else:
+            image = assets['run'][0][0]
+            info = [image, position, entity_data['size'], assets]
+
+        return entity_data['class'](*info)
+
+    # Key of the images of an entity in the SurfaceCache (see __cached_lookup)
+    def __asset_key(self, entity_data):
+        if entity_data['visual']:
+            return ('animation', entity_data['size'], entity_data['asset'], entity_data['fSize'])
 
+        return ('colour', entity_data['size'], entity_data['colour'])
+
+    def __entity_assets(self, entity_data):
+        if entity_data['visual']:
+            return self.__cached_lookup(entity_data['size'], entity_data['asset'], entity_data['visual'], entity_data['fSize'])
+
+        return self.__cached_lookup(entity_data['size'], entity_data['colour'])
+
+    # Paths of the background and foreground images of a level
+    def __image_paths(self, level):
+        return f'images/background/Level_{level}/thigh.png', f'images/foreground/Level_{level}/thig.png'
+
+    # Opens the background and foreground images of a level, cut into the pieces of its chunks (see ImageChunks). Only the pieces near
+    # the camera are read while the level is played; the whole image is decoded just once, to cut the pieces that are kept on disk.
+    def __images(self, built):
+        layers = {}
+        for name, path in zip(('background', 'foreground'), self.__image_paths(built.level)):
+            folder, _, file = path.rpartition('/')
+
+            # The size of the image is known from the asset manifest, without decoding it
+            if (info := Manifest.shared().files(folder).get(file)) and info['width']:
+                layers[name] = (path, ImageChunks(built.chunks, self.IMAGE_POSITION, (info['width'], info['height'])))
+            elif self.SHOW_ERRORS == True:
+                print(f'No {name} found for level {built.level}')
+
+        # The images whose pieces are not cut yet are decoded at once (see ImageDecoder)
+        ImageDecoder.shared().prefetch([path for path, layer in layers.values() if not SpriteCache.shared().contains(path, layer.variant)])
+
+        for name, (path, layer) in layers.items():
+            try:
+                layer.open(path)
+                setattr(built, name, layer)
+            except:
+                if self.SHOW_ERRORS == True:
+                    print(f'Could not read the {name} of level {built.level}')
+
+        built.images_loaded = True
+
+    # Returns the image of 'size' filled with the colour 'asset', or (with 'animation') the animations in the asset
+    # folder 'asset' by name. Both are kept in the SurfaceCache, which is shared with the other assets of the game.
     def __cached_lookup(self, size, asset, animation=False, frame_size=None, ):
+        cache = SurfaceCache.shared()
 
         if not animation:
-            cached_lookup = (size, asset)
+            cached_lookup = ('colour', size, asset)
 
-            if not ( cached_image := self.__cached_assets.get(cached_lookup, None) ):
+            if not ( cached_image := cache.get(cached_lookup, None) ):
                 cached_image = pygame.Surface(size)
                 cached_image.fill(asset)
 
-                self.__cached_assets[cached_lookup] = cached_image
+                cache.put(cached_lookup, cached_image)
 
             return cached_image
+
+        cached_lookup = ('animation', size, asset, frame_size)
+
+        if ( temp_assets := cache.get(cached_lookup, None) ):
+            return temp_assets
         
         temp_assets = {}
         FOLDER_PATH = self.ROOT_PATH + asset
-        
-        for file_path in os.listdir(FOLDER_PATH):
-            cached_lookup = (size, asset + file_path)
 
+        # What the frames of each image are made for (see SpriteCache)
+        variants = {file_path : ('spritesheet', frame_size, (83,83,83)) if 'spritesheet' in file_path.partition('_')[2] else ('scaled', size)
+                    for file_path in Manifest.shared().files(asset)}
+
+        # The images that have to be decoded are all decoded at once, by other processes (see ImageDecoder)
+        decoded = [FOLDER_PATH + file_path for file_path, variant in variants.items() if not SpriteCache.shared().contains(FOLDER_PATH + file_path, variant)]
+        ImageDecoder.shared().prefetch(decoded)
+        
+        for file_path, variant in variants.items():
             file_name = file_path.partition('_')
-            
-            if not (cached_asset := self.__cached_assets.get(cached_lookup, None)):
-                cached_asset = pygame.image.load(FOLDER_PATH + file_path).convert_alpha()
+            image_path = FOLDER_PATH + file_path
 
-                if 'spritesheet' in file_name[2]:
-                    cached_asset = Spritesheet(cached_asset, frame_size).divide_spritesheet((83,83,83))
-                else:
-                    cached_asset = pygame.transform.scale(cached_asset, size)
+            # The finished frames are kept on disk, so the image is only decoded and cut the first time (see SpriteCache)
+            if 'spritesheet' in file_name[2]:
+                amount = Manifest.shared().frames(asset, file_path, frame_size[0])
+                frames = SpriteCache.shared().frames(image_path, variant,
+                    lambda: sum(Spritesheet(ImageDecoder.shared().load(image_path), frame_size, amount).divide_spritesheet((83,83,83)), []))
 
-                self.__cached_assets[cached_lookup] = cached_asset
+                cached_asset = [frames[:len(frames) // 2], frames[len(frames) // 2:]] # Regular and flipped frames
+            else:
+                cached_asset = SpriteCache.shared().frames(image_path, variant,
+                    lambda: [pygame.transform.scale(ImageDecoder.shared().load(image_path), size)])[0]
 
             temp_assets[file_name[0]] = cached_asset
 
+        ImageDecoder.shared().discard(decoded) # Frees the images that were not needed after all (e.g. cut by another thread meanwhile)
+        cache.put(cached_lookup, temp_assets)
+
         return temp_assets
\ No newline at end of file
@@ -1,63 +1,199 @@
+# Standard
+from bisect import bisect_left
+from itertools import islice, count
+
 import pygame
 
+# Local
+from .shapes import Rectangle
+from .broadphase import SweepAndPrune
+from .physics import Physics, integrate_all
 
 """
 The class 'EntityManager' manages groups of entities. Members of the group gain access to essential, shared functions such as 'update' and 'render'.
 
+Entities are kept in one pool (list) per type, and every entity gets a handle (a number) that stays the same for as long as it is in
+the manager. An entity knows its handle and its slot (index) in its pool, so it is removed by moving the last entity of the pool into
+its slot - the pools are never copied or rebuilt.
 """
 class EntityManager:
     def __init__(self):
-        self.entities = [] #! List that contains all the entities in the manager.
+        self.pools = {} #! Entity type -> list of the entities of that type, in the order the types were first added (the player's first).
+        self.handles = {} #! Handle -> entity, for every entity in the manager.
+        self.player = None #! Handle of the player.
+        self.next_handle = count(1)
+
+        self.broadphase = SweepAndPrune() #! Finds the entities that touch each other.
+
+        self.buckets = {} #! Entity type -> its entities in view; drawn one type after the other, in the order the types were first seen (the player's first).
+        self.draw_list = [] #! (image, position) of each entity in view. Kept between frames and refilled in place, up to the entities in view.
+        self.CULL_MARGIN = 128 #! Most pixels an image may reach past the body of its entity (incl. its movement since the last update).
 
     #! Function 'update' adjusts logic of all entities in manager. Removes an entity from the manager if it is dead.
+    #! The player is never removed: a dead player ends the level (see Player.after_physics), and stays resolvable until then (see 'retr_player').
+    #! The physics step of all entities is run at once, between their 'before_physics' and 'after_physics' steps.
+    #! While the profiler is enabled, the time of each entity is added to its class (e.g. 'update Player').
     def update(self, dt, quadtree, game):
-        self.entities = [entity for entity in self.entities if entity.update(dt, quadtree, game)]
+        profiler = game.profiler
+
+        for kind, pool in self.pools.items():
+            for entity in pool:
+                entity.last_position = (entity.x, entity.y) #! Kept to interpolate from when rendering.
+                entity.before_physics(dt, quadtree, game)
+            profiler.lap('update ' + kind.__name__)
+
+        integrate_all([entity for kind, pool in self.pools.items() if issubclass(kind, Physics) for entity in pool], dt)
+        profiler.lap('physics')
+
+        for kind, pool in self.pools.items():
+            dead = [entity for entity in pool if not entity.after_physics(dt, quadtree, game) and entity.handle != self.player]
+            for entity in dead:
+                self.remove(entity)
+            profiler.lap('update ' + kind.__name__)
+
+        self.interact(game)
+        profiler.lap('interact')
+
+    #! Function 'interact' lets every pair of overlapping entities react to each other, e.g. an enemy that touches the player.
+    def interact(self, game):
+        self.broadphase.update(self.handles.values())
+
+        for (kind, other_kind), pairs in self.broadphase.candidates.items():
+            for entity, other in pairs:
+                if hasattr(entity, 'encounter'):
+                    entity.encounter(kind, other, other_kind, game)
+                if hasattr(other, 'encounter'):
+                    other.encounter(other_kind, entity, kind, game)
+
+    #! Function 'render' draws the entities in view onto 'screen', 'alpha' (0 to 1) of the way from their previous position to their current one.
+    #! Only the entities near the view are looked at (see 'visible'), so the cost follows the entities on screen, not those in the level.
+    def render(self, screen, offset=(0,0), alpha=1):
+        count = self.fill_draw_list(Rectangle(offset, screen.get_size()), offset, alpha)
+
+        screen.fblits(islice(self.draw_list, count)) #! Method 'fblits' renders images of all entities onto 'screen'.
+
+    #! Function 'render_debug' draws the rectangles of the enemies in view (their body, and what they can see), e.g. while tuning enemies.
+    def render_debug(self, screen, offset=(0,0)):
+        for entity in self.visible(Rectangle(offset, screen.get_size()), self.CULL_MARGIN):
+            if hasattr(entity, 'view'):
+                pygame.draw.rect(screen, (255,0,255), (entity.view.x - offset[0], entity.view.y - offset[1], entity.view.w, entity.view.h), 1)
+                pygame.draw.rect(screen, (135,0,255), (entity.x - offset[0], entity.y - offset[1], entity.w, entity.h), 1)
 
-    #! Function 'render' draws all the entities in the manager onto 'screen'.
-    def render(self, screen, offset=(0,0)):
+    #! Function 'visible' yields the entities whose body is within 'margin' pixels of 'view'. The broadphase keeps the bodies sorted along
+    #! one axis, so the first one in range is found by bisection, and the search ends at the first one past it.
+    def visible(self, view, margin):
+        broadphase = self.broadphase
+        if len(broadphase.members) != len(self.handles): #! Entities were added since the last update (e.g. a level was just loaded).
+            broadphase.update(self.handles.values())
+
+        if broadphase.axis == 'x':
+            start, end, low, high = view.x - margin, view.x + view.w + margin, view.y - margin, view.y + view.h + margin
+            position = lambda rect: rect.x
+        else:
+            start, end, low, high = view.y - margin, view.y + view.h + margin, view.x - margin, view.x + view.w + margin
+            position = lambda rect: rect.y
+
+        proxies = broadphase.proxies
+        for proxy in islice(proxies, bisect_left(proxies, start, key=lambda proxy: position(proxy.rect)), None):
+            rect = proxy.rect
+            if position(rect) > end:
+                break
+
+            if proxy.kind == 'body' and ((rect.y + rect.h > low and rect.y < high) if broadphase.axis == 'x' else (rect.x + rect.w > low and rect.x < high)):
+                yield proxy.owner
+
+        yield from broadphase.unindexed
+
+    #! Function 'fill_draw_list' puts the image + image position of every entity in view into the draw list, grouped by type, and returns how many there are.
+    def fill_draw_list(self, view, offset, alpha=1):
+        buckets = self.buckets
+        for bucket in buckets.values():
+            bucket.clear()
+
+        if not buckets and self.pools:
+            buckets[next(iter(self.pools))] = []
+
+        left, top, right, bottom = view.x, view.y, view.x + view.w, view.y + view.h
+
+        for entity in self.visible(view, self.CULL_MARGIN):
+            last_x, last_y = entity.last_position
+            x = last_x + (entity.x - last_x) * alpha #! Position between the previous update and the latest one.
+            y = last_y + (entity.y - last_y) * alpha
+
+            image = entity.image
+            w, h = image.get_size()
+            x = x - (w - entity.w) / 2 + entity.local_offset[0] #! Image position (not calculated for offsets).
+            y = y - (h - entity.h) / 2 + entity.local_offset[1]
+
+            if x + w <= left or x >= right or y + h <= top or y >= bottom:
+                continue
+
+            if (bucket := buckets.get(type(entity), None)) is None:
+                bucket = buckets[type(entity)] = []
+            bucket.append((entity, x - offset[0], y - offset[1])) #! Image position (calculated for offsets).
+
+        draw_list = self.draw_list
+        count = 0
+        for bucket in buckets.values():
+            for entity, x, y in bucket:
+                if count < len(draw_list):
+                    draw_list[count] = (entity.image, (x, y))
+                else:
+                    draw_list.append((entity.image, (x, y)))
+                count += 1
+
+        return count
+
+    #! Adds singular entity to the manager and returns its handle. An entity that was in the manager before (e.g. one that was suspended) keeps its handle.
+    def add(self, entity):
+        if getattr(entity, 'handle', None) is None:
+            entity.handle = next(self.next_handle)
 
-        screen.fblits(self.current_image_position(offset)) #! Method 'fblits' renders images of all entities onto 'screen'.
+        pool = self.pools.setdefault(type(entity), [])
+        entity.slot = len(pool)
+        pool.append(entity)
 
-        #! Extra renders; not images of the entities.
-        player = self.retr_player()
-        #pygame.draw.rect(screen, (50, 0, 255,), (player.x - offset[0], player.y - offset[1], player.w, player.h), 1)
+        self.handles[entity.handle] = entity
 
-        for entity in self.entities:
-            if hasattr(entity, 'attack_view'):
-                pygame.draw.rect(screen, (255,0,255), (entity.attack_view.x - offset[0], entity.attack_view.y - offset[1], entity.attack_view.w, entity.attack_view.h), 1)
-                pygame.draw.rect(screen, (135,0,255), (entity.x - offset[0], entity.y - offset[1], entity.w, entity.h), 1)
-                pass
+        return entity.handle
 
-        #pygame.draw.rect(screen, (255,0,255), (player.attack_boundary.x - offset[0], player.attack_boundary.y - offset[1], player.attack_boundary.w, player.attack_boundary.h), 1)
-    
-    #! Fuction 'current_image_position' returns a tuple that contains the image + image position of all the entities in the manager.
-    def current_image_position(self, offset):
-        entities = []
+    #! Adds the player to the manager (see 'retr_player').
+    def add_player(self, player):
+        self.player = self.add(player)
+        return self.player
 
-        #! Gathers image and image position of all the entities into a list.
-        for entity in self.entities:
-            position = [entity.x - (entity.image.get_width() - entity.w) / 2, entity.y - (entity.image.get_height() - entity.h) / 2] #! Image position (not calculated for offsets).
+    #! Adds multiple entities to the manager.
+    def add_multiple(self, entities):
+        for entity in entities:
+            self.add(entity)
 
-            entities.append((entity.image, [position[n] + entity.local_offset[n] - offset[n] for n in range(2)])) #! Entity's image and image position (calculated for offsets) - appended to temp list.
+    #! Removes an entity from the manager: the last entity of its pool takes its slot.
+    def remove(self, entity):
+        pool = self.pools[type(entity)]
 
-        return tuple(entities)
+        last = pool.pop()
+        if last is not entity:
+            pool[entity.slot] = last
+            last.slot = entity.slot
 
-    #! Appends singular entity to the manager.
-    def add(self, entity):
-        self.entities.append(entity)
+        del self.handles[entity.handle]
 
-    #! Appends multiple entities to the manager.
-    def add_multiple(self, entities):
-        self.entities.extend(entities)
+    #! Returns the entity of a handle, or None if it is no longer in the manager.
+    def get(self, handle):
+        return self.handles.get(handle, None)
 
-    #! Finds the player in the entity list and returns it.
+    #! Returns the player.
     def retr_player(self):
-        return self.entities[0]
+        return self.handles[self.player]
+
+    #! Returns the entities of a type (the pool itself, so it is not to be changed while iterating over it).
+    def of_type(self, kind):
+        return self.pools.get(kind, ())
 
-    #! Returns all entities.
+    #! Returns all entities (a view of them, in the order they were added).
     def retrieve_entities(self):
-        return self.entities
+        return self.handles.values()
 
     #! Returns a number of all entities in the manager.
     def len(self):
-        return len(self.entities)
\ No newline at end of file
+        return len(self.handles)
\ No newline at end of file
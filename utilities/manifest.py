@@ -0,0 +1,160 @@
+# Standard
+import os
+import json
+import struct
+
+"""
+Class Manifest(): An index of every folder and file in the asset folder (images/), so that assets can be found by
+folder name without walking the directory tree. For each file it keeps the size and modification time, and for PNG
+images also the width and height (from which the number of frames of a spritesheet follows, see frames()).
+
+The index is saved to disk and read again at the next startup, where it is checked by looking up the modification
+times of the indexed folders and files only (a folder's time changes whenever a file is added to or removed from it).
+Folders that have changed are indexed again; the rest of the working tree is never looked at.
+"""
+class Manifest:
+    shared_manifest = None
+    VERSION = 2
+
+    def __init__(self, root='images', path='cache/manifest.json'):
+        self.root = root # Asset folder, relative to the working directory
+        self.path = path # Where the index is saved
+
+        self.folders = {} # Folder path -> {'mtime', 'files' : {name -> {'size', 'mtime', 'width', 'height'}}, 'folders' : [names]}
+        self.changed = False
+        self.matches = {} # Name -> folders that contain it in their path (see matching())
+
+        self.load()
+        self.validate(self.root)
+
+        if self.changed:
+            self.save()
+
+    """
+    Method shared(): Returns the manifest used by the whole game, which is loaded the first time it is needed.
+    """
+    @classmethod
+    def shared(cls):
+        if not cls.shared_manifest:
+            cls.shared_manifest = cls()
+
+        return cls.shared_manifest
+
+    def load(self):
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') == self.VERSION and data.get('root') == self.root:
+            self.folders = data['folders']
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'w') as file:
+                json.dump({'version' : self.VERSION, 'root' : self.root, 'folders' : self.folders}, file)
+        except OSError:
+            pass # The manifest is only an optimisation; it is built again at the next startup
+
+        self.changed = False
+
+    """
+    Method validate(): Checks the indexed folder 'folder' (and everything under it) against the disk, and indexes
+    whatever has been added or changed since the index was made.
+    """
+    def validate(self, folder):
+        try:
+            mtime = os.stat(folder).st_mtime
+        except OSError:
+            if self.folders.pop(folder, None) is not None:
+                self.changed = True
+            return
+
+        entry = self.folders.get(folder)
+        if not entry or entry['mtime'] != mtime:
+            entry = self.scan(folder, mtime)
+        else:
+            for name, info in entry['files'].items():
+                try:
+                    stat = os.stat(folder + '/' + name)
+                except OSError: # The file is gone, so the index of the folder is out of date
+                    entry = self.scan(folder, mtime)
+                    break
+
+                if (info['mtime'], info['size']) != (stat.st_mtime, stat.st_size):
+                    entry['files'][name] = self.describe(folder + '/' + name, stat)
+                    self.changed = True
+
+        for name in entry['folders']:
+            self.validate(folder + '/' + name)
+
+    # Indexes the files and sub-folders of one folder
+    def scan(self, folder, mtime):
+        entry = {'mtime' : mtime, 'files' : {}, 'folders' : []}
+
+        with os.scandir(folder) as items:
+            for item in sorted(items, key=lambda item: item.name):
+                if item.is_dir():
+                    entry['folders'].append(item.name)
+                elif item.is_file():
+                    entry['files'][item.name] = self.describe(folder + '/' + item.name, item.stat())
+
+        # Forgets sub-folders that no longer exist
+        for name in self.folders.get(folder, entry)['folders']:
+            if name not in entry['folders']:
+                self.forget(folder + '/' + name)
+
+        self.folders[folder] = entry
+        self.matches = {}
+        self.changed = True
+
+        return entry
+
+    def forget(self, folder):
+        for name in self.folders.pop(folder, {}).get('folders', []):
+            self.forget(folder + '/' + name)
+
+    def describe(self, path, stat):
+        width, height = None, None
+
+        # The size of a PNG image is in its header, right after the signature (so the image is not decoded)
+        if path.lower().endswith('.png'):
+            try:
+                with open(path, 'rb') as file:
+                    header = file.read(24)
+                if header[:8] == b'\x89PNG\r\n\x1a\n' and header[12:16] == b'IHDR':
+                    width, height = struct.unpack('>II', header[16:24])
+            except OSError:
+                pass
+
+        return {'size' : stat.st_size, 'mtime' : stat.st_mtime, 'width' : width, 'height' : height}
+
+    """
+    Method files(): Returns the indexed files of a folder (e.g. 'images/player') as a dictionary of name -> file
+    information, or an empty dictionary if there is no such folder.
+    """
+    def files(self, folder):
+        entry = self.folders.get(folder.strip('/'))
+        return entry['files'] if entry else {}
+
+    """
+    Method matching(): Returns the folders (with at least one file) whose path contains 'name', as a list of
+    (folder path, files) pairs.
+    """
+    def matching(self, name):
+        name = name.lower()
+
+        if (matches := self.matches.get(name)) is None:
+            matches = self.matches[name] = [(path, entry['files']) for path, entry in self.folders.items() if name in path.lower() and entry['files']]
+
+        return matches
+
+    """
+    Method frames(): Returns how many frames of 'frame_width' pixels an indexed image holds side by side, or None if
+    its size is not known.
+    """
+    def frames(self, folder, name, frame_width):
+        info = self.files(folder).get(name)
+        return info['width'] // frame_width if info and info.get('width') else None
@@ -41,6 +41,10 @@ class Menu:
         self.forw_pressed = False
         self.button_index = 0
 
+        # Dirty rectangles: only the parts of the window that changed are drawn again, and only those are shown
+        self.redraw = True # The whole window is drawn on the next frame (e.g. when the menu is opened)
+        self.cursor = None # Area of the cursor as last drawn
+
     def navigate_buttons(self):
         key = pygame.key.get_pressed()
         if (key[pygame.K_LEFT] or key[pygame.K_UP]) and not self.back_pressed:
@@ -68,6 +72,39 @@ class Menu:
         if not key[pygame.K_RIGHT] and not key[pygame.K_DOWN]:
             self.forw_pressed = False
 
+    # Paints the background of the menu over 'area' of the window
+    def restore(self, area):
+        self.game.window.fill((11,11,11), area)
+
+    # Draws the buttons and the cursor, but only where they changed since the last frame: buttons whose image changed
+    # (or that the cursor was drawn over), and the cursor at its old and new position. Then shows only those areas.
+    def render_changes(self):
+        window = self.game.window
+
+        if self.redraw:
+            self.restore(window.get_rect())
+            changed = self.buttons
+        else:
+            changed = [button for button in self.buttons if button.image is not button.drawn or (self.cursor and self.cursor.colliderect(button.drawn_area))]
+
+        dirty = [button.drawn_area for button in changed if button.drawn_area]
+        if self.cursor:
+            dirty.append(self.cursor)
+
+        for area in dirty:
+            self.restore(area)
+
+        for button in changed:
+            dirty.append(button.render(window, (0,0)))
+
+        mouse_pos = pygame.mouse.get_pos()
+        scale = [self.game.res_window[n] / self.game.res_screen[n] for n in range(2)]
+        self.cursor = pygame.draw.rect(window, (255,255,255), (*mouse_pos, 2 * scale[0], 2 * scale[1]))
+        dirty.append(self.cursor)
+
+        self.game.backend.flip(None if self.redraw else dirty)
+        self.redraw = False
+
     def display_reset(self):
         self.button_index = 0
         self.cooldown = True
@@ -125,21 +162,13 @@ class MainMenu(Menu):
             button.update(self, self.game)
 
     def render(self):
-        self.game.window.fill((11,11,11))
-
-        for button in self.buttons:
-            button.render(self.game.window, (0,0))
-
-        mouse_pos = pygame.mouse.get_pos()
-        scale = [self.game.res_window[n] / self.game.res_screen[n] for n in range(2)]
-        pygame.draw.rect(self.game.window, (255,255,255), (*mouse_pos, 2 * scale[0], 2 * scale[1]))
-
-        pygame.display.update()
+        self.render_changes()
 
     def menu_sequence(self):
         self.button_numb = 0
         self.run_menu = True
         self.cooldown = True
+        self.redraw = True
 
         while self.run_menu:
             self.update()
@@ -167,6 +196,8 @@ class LoadMenu(Menu):
         self.progress = 0
         self.fill = 0
         self.queue = Queue()
+        self.redraw = True
+        self.drawn_fill = 0 # Width of the progress bar as last drawn
 
         # Starts up a background (sub-) process that loads the assets
         load = Thread(target=self.game.LEVEL_INFO.load_level, args=(self.queue, self.game))
@@ -211,19 +242,30 @@ class LoadMenu(Menu):
         self.fill = load_progress * self.bar_width
 
     def render(self):
-        # Resets the background
-        self.game.window.fill((11,11,11))
+        # Only the part of the progress bar that was filled since the last frame is painted and shown
+        if self.redraw:
+            # Resets the background
+            self.game.window.fill((11,11,11))
+
+            # Paints the outline of the progress bar onto screen
+            outline_rect = (self.x - 10, self.y - 10, self.bar_width + 20, self.bar_height + 20)
+            pygame.draw.rect(self.game.window, (255,255,255), outline_rect, 2)
 
-        # Calculates the progress bar dimensions
-        outline_rect = (self.x - 10, self.y - 10, self.bar_width + 20, self.bar_height + 20)
-        fill_rect = (self.x, self.y, self.fill, self.bar_height)
+            self.drawn_fill = 0
 
-        # Paints the progress bar onto screen
-        pygame.draw.rect(self.game.window, (255,255,255), outline_rect, 2)
-        pygame.draw.rect(self.game.window, (255,255,255), fill_rect)
+        dirty = []
+        if int(self.fill) > int(self.drawn_fill):
+            fill_rect = (self.x + int(self.drawn_fill), self.y, int(self.fill) - int(self.drawn_fill), self.bar_height)
+            dirty.append(pygame.draw.rect(self.game.window, (255,255,255), fill_rect))
+            self.drawn_fill = self.fill
 
         # Displays changes to the screen
-        pygame.display.update()
+        if self.redraw:
+            self.game.backend.flip()
+        elif dirty:
+            self.game.backend.flip(dirty)
+
+        self.redraw = False
 
 class PauseMenu(Menu):
     def __init__(self, game):
@@ -240,7 +282,8 @@ class PauseMenu(Menu):
         self.run_menu = True
         self.cooldown = True
 
-        self.background.blit(self.game.window, (0,0))
+        self.background.blit(self.game.backend.frame(), (0,0))
+        self.redraw = True
 
         while self.run_menu:
             self.update()
@@ -266,15 +309,9 @@ class PauseMenu(Menu):
         if not mouse[0]:
             self.cooldown = False
 
-    def render(self):
-
-        self.game.window.blit(self.background, (0,0))
+    # The last frame of the level is the background of the pause menu
+    def restore(self, area):
+        self.game.window.blit(self.background, area, area)
 
-        for button in self.buttons:
-            button.render(self.game.window, (0, 0))
-
-        mouse_pos = pygame.mouse.get_pos()
-        scale = [self.game.res_window[n] / self.game.res_screen[n] for n in range(2)]
-        pygame.draw.rect(self.game.window, (255,255,255), (*mouse_pos, 2 * scale[0], 2 * scale[1]))
-
-        pygame.display.update()
+    def render(self):
+        self.render_changes()
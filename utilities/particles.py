@@ -0,0 +1,159 @@
+# Standard
+import random
+
+# 3rd party
+import numpy as np
+import pygame
+
+"""
+Class Particles(): Keeps every particle of a level (e.g. the blood of a dying enemy) in a few NumPy arrays instead of
+one entity object per particle. All particles are moved with the same verlet integration as Physics (without drag)
+in one vectorised step, collide with the tiles of a TileGrid in bulk, and are drawn with a single fblits call.
+"""
+class Particles:
+    def __init__(self, colour=(185,185,185), sizes=(3, 6), capacity=1024, gravity=(0, 9.81)):
+        self.GRAVITY = np.array(gravity, dtype=float)
+        self.SIZES = sizes # Smallest and largest size (particles are square)
+
+        self.count = 0 # Particles in use; they are always the first 'count' rows of the arrays
+
+        self.current_position = np.zeros((capacity, 2))
+        self.previous_position = np.zeros((capacity, 2))
+        self.last_position = np.zeros((capacity, 2)) # Position before the latest update, to interpolate from when rendering
+        self.impulse = np.zeros((capacity, 2)) # Force of the initial impact, applied during the first update
+        self.time = np.zeros(capacity) # Lifespan left
+        self.size = np.zeros(capacity, dtype=int)
+
+        # One image per size, shared by all particles
+        self.images = {}
+        for size in range(sizes[0], sizes[1] + 1):
+            self.images[size] = pygame.Surface((size, size))
+            self.images[size].fill(colour)
+
+    """
+    Method emit(): Spawns 'amount' particles at 'position', each thrown in a random direction.
+    """
+    def emit(self, position, amount):
+        if self.count + amount > len(self.time):
+            self.grow(self.count + amount)
+
+        for n in range(self.count, self.count + amount):
+            self.current_position[n] = self.previous_position[n] = self.last_position[n] = position
+            self.impulse[n] = (random.randint(0, 42) / 6 - 3.5, random.randint(0, 42) / 6 - 3.5)
+            self.time[n] = random.randint(20, 35)
+            self.size[n] = random.randint(*self.SIZES)
+
+        self.count += amount
+
+    def grow(self, capacity):
+        capacity = max(capacity, 2 * len(self.time))
+
+        for name in ('current_position', 'previous_position', 'last_position', 'impulse', 'time', 'size'):
+            array = getattr(self, name)
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            setattr(self, name, grown)
+
+    """
+    Method update(): Moves every particle, resolves collisions with the tiles of 'grid', and removes the
+    particles whose time has run out.
+    """
+    def update(self, dt, grid):
+        n = self.count
+        if not n:
+            return
+
+        current = self.current_position[:n]
+        previous = self.previous_position[:n]
+
+        # Forces (the impact only pushes a particle during its first update)
+        acceleration = self.impulse[:n] / dt + self.GRAVITY
+        self.impulse[:n] = 0
+
+        # Where the particles were at the end of the last update
+        start = self.last_position[:n]
+        start[:] = current
+
+        # Physics, 10 substeps
+        for _ in range(10):
+            velocity = current - previous
+            previous[:] = current
+            current[:] = current + velocity + acceleration * dt**2
+
+        # Collision, first on the x-axis (at the old height) and then on the y-axis (like Physics.check_collision)
+        if grid.rows and grid.columns:
+            self.collide(grid, 0, np.column_stack((current[:, 0], start[:, 1])))
+            self.collide(grid, 1, current)
+
+        # Timespan decay; timeout means death
+        self.time[:n] -= dt * 10
+        alive = self.time[:n] > 0
+
+        if not alive.all():
+            for name in ('current_position', 'previous_position', 'last_position', 'impulse', 'time', 'size'):
+                array = getattr(self, name)
+                kept = array[:n][alive]
+                array[:len(kept)] = kept
+
+            self.count = int(alive.sum())
+
+    """
+    Method collide(): Pushes the particles that overlap a tile at 'position' back out of it along one axis (0 for x,
+    1 for y), in the direction they came from, and stops them on that axis. A particle is smaller than a tile, so it
+    can only overlap the tiles under its four corners.
+    """
+    def collide(self, grid, axis, position):
+        n = self.count
+        current = self.current_position[:n]
+        previous = self.previous_position[:n]
+        size = self.size[:n]
+
+        cells = np.frombuffer(grid.cells, dtype=np.uint16).reshape(grid.rows, grid.columns)
+        tile = np.array((grid.tile_w, grid.tile_h))
+        origin = np.array((grid.x, grid.y))
+
+        # Cells under the top left and bottom right corners (the right and bottom edges are exclusive)
+        first = np.floor((position - origin) / tile).astype(int)
+        last = np.ceil((position + size[:, None] - origin) / tile).astype(int) - 1
+
+        def solid(column, row):
+            inside = (column >= 0) & (column < grid.columns) & (row >= 0) & (row < grid.rows)
+            result = np.zeros(n, dtype=bool)
+            result[inside] = cells[row[inside], column[inside]] != 0
+            return result
+
+        # Which of the spanned cells along the axis are solid (on either of the two cells across)
+        near = solid(first[:, 0], first[:, 1]) | solid(*((first[:, 0], last[:, 1]) if axis == 0 else (last[:, 0], first[:, 1])))
+        far = solid(last[:, 0], last[:, 1]) | solid(*((last[:, 0], first[:, 1]) if axis == 0 else (first[:, 0], last[:, 1])))
+        far &= last[:, axis] != first[:, axis]
+
+        velocity = current[:, axis] - previous[:, axis]
+        forward = (velocity > 0) & (near | far)
+        backward = (velocity < 0) & (near | far)
+
+        # Moving forward: stops in front of the nearest solid cell; moving backward: behind the farthest one
+        blocking = np.where(near, first[:, axis], last[:, axis])
+        edge = origin[axis] + blocking * tile[axis]
+        current[forward, axis] = edge[forward] - size[forward]
+
+        blocking = np.where(far, last[:, axis], first[:, axis])
+        edge = origin[axis] + (blocking + 1) * tile[axis]
+        current[backward, axis] = edge[backward]
+
+        stopped = forward | backward
+        previous[stopped, axis] = current[stopped, axis]
+
+    """
+    Method render(): Draws every particle onto 'screen' with one call, 'alpha' (0 to 1) of the way from their
+    previous position to their current one.
+    """
+    def render(self, screen, offset=(0,0), alpha=1):
+        n = self.count
+        if not n:
+            return
+
+        images = self.images
+        last = self.last_position[:n]
+        positions = (last + (self.current_position[:n] - last) * alpha - offset).tolist()
+
+        screen.fblits([(images[size], position) for size, position in zip(self.size[:n].tolist(), positions)])
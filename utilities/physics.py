@@ -1,9 +1,18 @@
+# 3rd party
+import numpy as np
+
 from utilities.shapes import Rectangle
 
 class Physics: # Enables gravity through verlet integration and collision detection for it
+    SUBSTEPS = 10 # Verlet steps per update
+
     def __init__(self, position, mass=1, gravity=(0, 9.81)):
         self.current_position = position
         self.previous_position = position
+        self.last_position = position # Position before the latest update, to interpolate from when rendering
+
+        self.force = (0, 0) # Force applied during the next physics step
+        self.apply_drag = True
 
         self.velocity = [0,0]
 
@@ -15,6 +24,18 @@ class Physics: # Enables gravity through verlet integration and collision detect
         self.GRAVITY = gravity
         self.RESISTANCE = (9.81 * 100, 0)
         
+    # Updates an entity on its own: before_physics() sets its force, the physics step moves it, and after_physics()
+    # handles collision and everything else. The entity manager runs the same three steps, but with the physics step
+    # of all its entities batched together (see integrate_all).
+    def update(self, dt, static, game):
+        self.before_physics(dt, static, game)
+        self.integrate(dt)
+        return self.after_physics(dt, static, game)
+
+    def integrate(self, dt):
+        for _ in range(self.SUBSTEPS):
+            self.update_verlet(dt, self.force, self.apply_drag)
+
     def update_verlet(self, dt, force=(0,0), apply_drag=True):
         # Current velocity
         velocity = [self.current_position[n] - self.previous_position[n] for n in range(2)]
@@ -95,4 +116,38 @@ class Physics: # Enables gravity through verlet integration and collision detect
         result = False if quadtree.hit(Rectangle( (int(self.x + dx), int(self.y + 1)), (self.w, self.h) )) else True
 
         self.previous_position = self.current_position
-        return result
\ No newline at end of file
+        return result
+
+
+# Runs the physics step (Physics.integrate) of many entities at once: their positions are gathered into arrays, every
+# substep is computed for all of them together with the same formulas as update_verlet, and the results are written back.
+def integrate_all(bodies, dt):
+    if not bodies:
+        return
+
+    current = np.array([body.current_position for body in bodies], dtype=float)
+    previous = np.array([body.previous_position for body in bodies], dtype=float)
+
+    force = np.array([body.force for body in bodies], dtype=float)
+    gravity = np.array([body.GRAVITY for body in bodies], dtype=float)
+    mass = np.array([body.MASS for body in bodies], dtype=float)[:, None]
+    resistance = np.array([body.RESISTANCE for body in bodies], dtype=float)
+    drag = np.array([body.apply_drag for body in bodies])[:, None]
+
+    # Current acceleration (the same for every substep)
+    acceleration = (force + gravity) / mass
+
+    for _ in range(Physics.SUBSTEPS):
+        # Current velocity
+        velocity = current - previous
+
+        # Current resistance (if enabled)
+        drag_force = np.where(drag, resistance * velocity * dt, 0)
+
+        # Verlet integration, with the addition of resistance
+        previous = current
+        current = current + velocity + (acceleration - drag_force) * dt**2
+
+    for body, current_position, previous_position in zip(bodies, current.tolist(), previous.tolist()):
+        body.current_position = current_position
+        body.previous_position = previous_position
\ No newline at end of file
@@ -0,0 +1,158 @@
+# Standard
+import json
+import time
+from array import array
+
+# 3rd party
+import pygame
+
+"""
+Class Profiler(): Times each phase of a frame (input, entity updates per class, blits, scaling, ...) and keeps the
+timings of the last 'capacity' frames in a ring buffer, one row of seconds per phase. A phase is timed with lap(),
+which gives the phase all the time since the previous lap (or since the frame began), so phases are simply marked
+where they end. Nothing is timed while the profiler is disabled, and lap() then returns right away.
+
+The timings can be shown in game (see render()) and saved as CSV or JSON (see export()).
+"""
+class Profiler:
+    def __init__(self, capacity=600):
+        self.enabled = False
+        self.capacity = capacity
+
+        self.phases = {} # Phase -> seconds per frame (ring buffer, in the order the phases were first seen)
+        self.totals = array('d', bytes(8 * capacity)) # Seconds of each whole frame
+        self.frames = 0 # Frames recorded so far; frame n is in slot n % capacity
+
+        self.current = {} # Phase -> seconds, for the frame being timed
+        self.frame_start = 0
+        self.last = 0 # Time of the previous lap
+
+        # Overlay
+        self.summary = [] # Lines of text, updated every SUMMARY_INTERVAL frames
+        self.SUMMARY_INTERVAL = 30
+        self.font = None
+
+    """
+    Method enable(): Turns timing on or off. Timing that is turned on in the middle of a frame starts a fresh frame
+    there, so that its first lap does not take in the time from before it was turned on.
+    """
+    def enable(self, enabled=True):
+        if enabled and not self.enabled:
+            self.enabled = True
+            self.begin_frame()
+
+        self.enabled = enabled
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+
+        self.current.clear()
+        self.frame_start = self.last = time.perf_counter()
+
+    """
+    Method lap(): Adds the time since the previous lap to 'phase'.
+    """
+    def lap(self, phase):
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0) + now - self.last
+        self.last = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+
+        slot = self.frames % self.capacity
+
+        for phase in self.current:
+            if phase not in self.phases:
+                self.phases[phase] = array('d', bytes(8 * self.capacity))
+        for phase, seconds in self.phases.items():
+            seconds[slot] = self.current.get(phase, 0)
+
+        self.totals[slot] = time.perf_counter() - self.frame_start
+        self.frames += 1
+
+        if self.frames % self.SUMMARY_INTERVAL == 0:
+            self.summary = None # Made again the next time it is drawn
+
+    # Slots of the recorded frames, oldest first
+    def slots(self):
+        first = max(self.frames - self.capacity, 0)
+        return [n % self.capacity for n in range(first, self.frames)]
+
+    """
+    Method percentiles(): Returns the 50th, 95th and 99th percentile (in seconds) of a phase, or of whole frames if
+    'phase' is None, over the recorded frames.
+    """
+    def percentiles(self, phase=None):
+        values = self.totals if phase is None else self.phases[phase]
+        values = sorted(values[slot] for slot in self.slots())
+
+        if not values:
+            return 0, 0, 0
+
+        return tuple(values[min(int(len(values) * share), len(values) - 1)] for share in (0.5, 0.95, 0.99))
+
+    """
+    Method render(): Draws the timings onto 'screen': a graph of the last frames (the line marks 'budget' seconds,
+    e.g. 1/60), the percentiles of the frame time, and the slowest phases by their 95th percentile.
+    """
+    def render(self, screen, budget):
+        if not self.font:
+            self.font = pygame.font.Font(None, 14)
+
+        w, h = 120, 40
+        x, y = screen.get_width() - w - 4, 4
+
+        overlay = pygame.Surface((w, h), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 150))
+
+        # One line per frame; twice the budget fills the graph
+        slots = self.slots()[-w:]
+        for column, slot in enumerate(slots, w - len(slots)):
+            height = min(int(self.totals[slot] / (2 * budget) * h), h)
+            colour = (90, 220, 90) if self.totals[slot] <= budget else (230, 70, 70)
+            pygame.draw.line(overlay, colour, (column, h - 1), (column, h - height))
+
+        pygame.draw.line(overlay, (255, 255, 255), (0, h // 2), (w, h // 2))
+        screen.blit(overlay, (x, y))
+
+        if not self.summary:
+            p50, p95, p99 = self.percentiles()
+            self.summary = [f'frame p50 {p50 * 1000:.1f} p95 {p95 * 1000:.1f} p99 {p99 * 1000:.1f} ms']
+
+            slowest = sorted(self.phases, key=lambda phase: self.percentiles(phase)[1], reverse=True)[:6]
+            self.summary += [f'{phase} p95 {self.percentiles(phase)[1] * 1000:.2f} ms' for phase in slowest]
+
+            self.summary = [self.font.render(line, True, (255, 255, 255), (0, 0, 0)) for line in self.summary]
+
+        for n, line in enumerate(self.summary):
+            screen.blit(line, (screen.get_width() - line.get_width() - 4, y + h + 2 + n * 11))
+
+    """
+    Method export(): Saves the recorded frames to 'path', as JSON (if it ends with '.json': the percentiles of every
+    phase, and the milliseconds of every phase per frame) or as CSV (a row of milliseconds per frame).
+    """
+    def export(self, path):
+        slots = self.slots()
+        names = list(self.phases)
+
+        if path.lower().endswith('.json'):
+            report = {
+                'frames' : len(slots),
+                'percentiles_ms' : {name : [value * 1000 for value in self.percentiles(phase)] for name, phase in [('frame', None)] + [(name, name) for name in names]},
+                'frames_ms' : [dict(frame=self.totals[slot] * 1000, **{name : self.phases[name][slot] * 1000 for name in names}) for slot in slots],
+            }
+
+            with open(path, 'w') as file:
+                json.dump(report, file, indent=2)
+            return
+
+        with open(path, 'w') as file:
+            file.write(','.join(['frame'] + names) + '\n')
+            for slot in slots:
+                file.write(','.join(f'{value * 1000:.4f}' for value in [self.totals[slot]] + [self.phases[name][slot] for name in names]) + '\n')
@@ -0,0 +1,101 @@
+# 3rd party
+import numpy as np
+import pygame
+
+"""
+Class Projectiles(): Keeps every projectile of a level (e.g. the bullets of the remnants) in a few NumPy arrays, like
+Particles. The arrays are made once, for a fixed number of projectiles; when they are full, nothing more is fired
+until a projectile is gone, so a long fight never takes more memory.
+
+Projectiles fly in a straight line, and are removed when they hit a tile, hit the player (who is hurt) or run out of
+time. All of them are moved and tested at once, and drawn with a single fblits call.
+"""
+class Projectiles:
+    def __init__(self, capacity=256, size=(2, 1), colour=(255,255,255), damage=10, lifetime=2):
+        self.SIZE = size
+        self.DAMAGE = damage
+        self.LIFETIME = lifetime # Seconds
+
+        self.count = 0 # Projectiles in use; they are always the first 'count' rows of the arrays
+
+        self.position = np.zeros((capacity, 2))
+        self.last_position = np.zeros((capacity, 2)) # Position before the latest update, to interpolate from when rendering
+        self.velocity = np.zeros((capacity, 2)) # Pixels per second
+        self.time = np.zeros(capacity) # Seconds left
+
+        self.image = pygame.Surface(size)
+        self.image.fill(colour)
+
+    """
+    Method fire(): Spawns a projectile at 'position' (its top left corner) that flies at 'velocity' (pixels per second).
+    Returns False if there is no room for it.
+    """
+    def fire(self, position, velocity):
+        n = self.count
+        if n == len(self.time):
+            return False
+
+        self.position[n] = self.last_position[n] = position
+        self.velocity[n] = velocity
+        self.time[n] = self.LIFETIME
+        self.count += 1
+
+        return True
+
+    """
+    Method update(): Moves every projectile, and removes the ones that hit a tile of 'grid' or the player of 'game'
+    (hurting them), and the ones whose time has run out.
+    """
+    def update(self, dt, grid, game):
+        n = self.count
+        if not n:
+            return
+
+        position = self.position[:n]
+        self.last_position[:n] = position
+        position += self.velocity[:n] * dt
+
+        self.time[:n] -= dt
+        alive = self.time[:n] > 0
+
+        # Tiles (the projectile is smaller than a tile, so its centre is tested)
+        if grid.rows and grid.columns:
+            cells = np.frombuffer(grid.cells, dtype=np.uint16).reshape(grid.rows, grid.columns)
+            centre = position + np.array(self.SIZE) / 2
+            column = np.floor((centre[:, 0] - grid.x) / grid.tile_w).astype(int)
+            row = np.floor((centre[:, 1] - grid.y) / grid.tile_h).astype(int)
+
+            inside = (column >= 0) & (column < grid.columns) & (row >= 0) & (row < grid.rows)
+            solid = np.zeros(n, dtype=bool)
+            solid[inside] = cells[row[inside], column[inside]] != 0
+            alive &= ~solid
+
+        # Player
+        player = game.LEVEL_INFO.entities.retr_player()
+        hits = ((position[:, 0] + self.SIZE[0] > player.x) & (position[:, 0] < player.x + player.w) &
+                (position[:, 1] + self.SIZE[1] > player.y) & (position[:, 1] < player.y + player.h) & alive)
+        if hits.any():
+            player.take_hit(game, self.DAMAGE)
+            alive &= ~hits
+
+        if not alive.all():
+            for array in (self.position, self.last_position, self.velocity, self.time):
+                kept = array[:n][alive]
+                array[:len(kept)] = kept
+
+            self.count = int(alive.sum())
+
+    """
+    Method render(): Draws every projectile onto 'screen' with one call, 'alpha' (0 to 1) of the way from their
+    previous position to their current one.
+    """
+    def render(self, screen, offset=(0,0), alpha=1):
+        n = self.count
+        if not n:
+            return
+
+        image = self.image
+        last = self.last_position[:n]
+        positions = (last + (self.position[:n] - last) * alpha - offset).tolist()
+
+        screen.fblits([(image, position) for position in positions])
@@ -1,76 +1,146 @@
 # Standard
-from copy import copy
-
-from utilities.shapes import Rectangle
+from array import array
 
 """
 Class Quadtree(): Creates a quadtree for a list of objects (with coordinates) that will enable a more
 efficient object look-up. A quadtree makes it possible to look for objects only within a certain area
 (coordinate plane) instead of iterating though all of the objects in the entire map, as one would do with list.
+
+The tree is stored in flat arrays rather than as nested node objects: every node has a center, four child
+indices (-1 when a quarter is empty) and a block of item indices. An item is pushed down into a quarter only if it
+fits wholly inside it; an item that crosses either center line stays in the node. Every item is therefore kept in
+exactly one node, and a query returns it at most once.
 """
 
 
 class QuadTree(object):
-    def __init__(self, items, depth=8, boundary=None):
-        # These variables represent the four corners of a leaf / area. Respectively: North West, North East, South East, South West.
-        self.nw = self.ne = self.se = self.sw = None
+    def __init__(self, items, depth=8, boundary=None, capacity=4):
+        self.items = list(items)
+
+        # Item rectangles as corners, in the same order as self.items
+        self.ix0 = array('d', (item.x for item in self.items))
+        self.iy0 = array('d', (item.y for item in self.items))
+        self.ix1 = array('d', (item.x + item.w for item in self.items))
+        self.iy1 = array('d', (item.y + item.h for item in self.items))
 
-        depth -= 1
-        if depth == 0 or not items:
-            self.items = items
-            return
+        # Node centers, children (4 per node: North West, North East, South East, South West) and item blocks;
+        # the items of a node are index[start : start + count]
+        self.cx, self.cy = array('d'), array('d')
+        self.children = array('i')
+        self.start = array('i')
+        self.count = array('i')
+        self.index = array('i')
 
-        # Creates a leaf / area (coordinate plane) large enough to span all the items (data points) in the quarters.
+        self.stack = [] # Reused by every query
+
+        # Creates an area (coordinate plane) large enough to span all the items (data points).
+        bounds = self.bounds(self.items)
         if boundary:
-            boundary = Rectangle( *boundary )
-        else:
-            boundary = copy(items[0])
-            for item in items[1:]:
-                boundary.union( item )
-
-        # Center coordinates
-        cx = self.cx = ( (boundary.x + boundary.w) / 2 )
-        cy = self.cy = ( (boundary.y + boundary.h) / 2 )
-
-        self.items = []
-        nw_items = []
-        ne_items = []
-        se_items = []
-        sw_items = []
-
-        for item in items:
-            in_nw = item.x <= cx and item.y <= cy
-            in_sw = item.x <= cx and item.y + item.h >= cy
-            in_ne = item.x + item.h >= cx and item.y <= cy
-            in_se = item.x + item.h >= cx and item.y + item.h >= cy
-
-            if in_nw and in_ne and in_se and in_sw:
-                self.items.append(item)
+            (x, y), (w, h) = boundary
+            bounds = (min(x, bounds[0]), min(y, bounds[1]), max(x + w, bounds[2]), max(y + h, bounds[3]))
+
+        self.build(bounds, depth, capacity)
+
+    """
+    Method bounds(): Returns the corners (x0, y0, x1, y1) of the area that spans all the items.
+    """
+    @staticmethod
+    def bounds(items):
+        if not items:
+            return (0, 0, 0, 0)
+
+        return (
+            min(item.x for item in items),
+            min(item.y for item in items),
+            max(item.x + item.w for item in items),
+            max(item.y + item.h for item in items)
+        )
+
+    """
+    Method build(): Splits the items into nodes, one node at a time, and fills the arrays.
+    """
+    def build(self, bounds, depth, capacity):
+        ix0, iy0, ix1, iy1 = self.ix0, self.iy0, self.ix1, self.iy1
+        pending = [(self.add_node(), bounds, list(range(len(self.items))), depth)]
+
+        while pending:
+            node, (x0, y0, x1, y1), indices, node_depth = pending.pop()
+
+            # Center coordinates
+            cx = self.cx[node] = x0 + (x1 - x0) / 2
+            cy = self.cy[node] = y0 + (y1 - y0) / 2
+
+            kept = []
+            quarters = ([], [], [], [])
+
+            if node_depth <= 1 or len(indices) <= capacity:
+                kept = indices
             else:
-                if in_nw: nw_items.append(item)
-                if in_ne: ne_items.append(item)
-                if in_se: se_items.append(item)
-                if in_sw: sw_items.append(item)
-
-        if nw_items:
-            self.nw = QuadTree(nw_items, depth, ( (boundary.x, boundary.y), (cx, cy) ))
-        if ne_items:
-            self.ne = QuadTree(ne_items, depth, ( (cx, boundary.y), (boundary.x + boundary.w, cy) ))
-        if se_items:
-            self.se = QuadTree(se_items, depth, ( (cx, cy), (boundary.x + boundary.w, boundary.y + boundary.h) ))
-        if sw_items:
-            self.sw = QuadTree(sw_items, depth, ( (boundary.x, cy), (cx, boundary.y + boundary.h) ))
+                for n in indices:
+                    if (ix0[n] < cx < ix1[n]) or (iy0[n] < cy < iy1[n]): # Crosses a center line
+                        kept.append(n)
+                    elif iy0[n] < cy: # North (its bottom edge is at most the center line)
+                        quarters[0 if ix0[n] < cx else 1].append(n)
+                    else: # South
+                        quarters[3 if ix0[n] < cx else 2].append(n)
+
+            self.start[node] = len(self.index)
+            self.count[node] = len(kept)
+            self.index.extend(kept)
+
+            corners = ((x0, y0, cx, cy), (cx, y0, x1, cy), (cx, cy, x1, y1), (x0, cy, cx, y1))
+            for n, quarter in enumerate(quarters):
+                if quarter:
+                    child = self.children[node * 4 + n] = self.add_node()
+                    pending.append((child, corners[n], quarter, node_depth - 1))
+
+    def add_node(self):
+        self.cx.append(0)
+        self.cy.append(0)
+        self.children.extend((-1, -1, -1, -1))
+        self.start.append(0)
+        self.count.append(0)
+
+        return len(self.cx) - 1
+
+    """
+    Method query(): Appends every item that collides with 'rect' to 'result' (a list owned by the caller,
+    which can be cleared and reused between queries) and returns it.
+    """
+    def query(self, rect, result):
+        x0, y0 = rect.x, rect.y
+        x1, y1 = x0 + rect.w, y0 + rect.h
+
+        items, index = self.items, self.index
+        ix0, iy0, ix1, iy1 = self.ix0, self.iy0, self.ix1, self.iy1
+        ncx, ncy, children, start, count = self.cx, self.cy, self.children, self.start, self.count
+
+        stack = self.stack
+        stack.append(0)
+
+        while stack:
+            node = stack.pop()
+
+            first = start[node]
+            for i in range(first, first + count[node]): # Indexed, as slicing an array would copy it
+                n = index[i]
+                if x1 > ix0[n] and x0 < ix1[n] and y1 > iy0[n] and y0 < iy1[n]:
+                    result.append(items[n])
+
+            # Only visits the quarters that 'rect' reaches into
+            c = node * 4
+            cx, cy = ncx[node], ncy[node]
+            if x0 < cx:
+                if y0 < cy and children[c] >= 0: stack.append(children[c])
+                if y1 > cy and children[c + 3] >= 0: stack.append(children[c + 3])
+            if x1 > cx:
+                if y0 < cy and children[c + 1] >= 0: stack.append(children[c + 1])
+                if y1 > cy and children[c + 2] >= 0: stack.append(children[c + 2])
+
+        return result
 
+    """
+    Method hit(): Returns a set with all the items that collide with 'rect'.
+    """
     def hit(self, rect):
-        hits = set( [ self.items[n] for n in rect.collide_all( self.items ) ] )
-                
-        if self.nw and rect.x <= self.cx and rect.y <= self.cy:
-            hits |= self.nw.hit(rect)
-        if self.sw and rect.x <= self.cx and rect.y + rect.h >= self.cy:
-            hits |= self.sw.hit(rect)
-        if self.ne and rect.x + rect.w >= self.cx and rect.y <= self.cy:
-            hits |= self.ne.hit(rect)
-        if self.se and rect.x + rect.w >= self.cx and rect.y + rect.h >= self.cy:
-            hits |= self.se.hit(rect)
-
-        return hits
+        return set(self.query(rect, []))
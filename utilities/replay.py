@@ -0,0 +1,204 @@
+# Standard
+import os
+import gzip
+import time
+import zlib
+import random
+import struct
+
+# 3rd party
+import pygame
+
+KEYS = (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_ESCAPE) # Keys that a level reads (see Player.input and Game.input)
+KEY_INDEX = {key : n for n, key in enumerate(KEYS)}
+
+"""
+File layout of a recording (gzip compressed, little-endian): magic, version, level, seed and checksum interval; then
+for every update the keys (bit mask of KEYS), mouse buttons (bit mask) and mouse position, and after every 'interval'
+updates a checksum of the state of the level (see checksum()) as it was before that update.
+"""
+MAGIC = b'BTSR'
+VERSION = 1
+HEADER = struct.Struct('<4sHiIH') # magic, version, level, seed, checksum interval
+TICK = struct.Struct('<BBhh') # keys, mouse buttons, mouse x, mouse y
+CHECK = struct.Struct('<I')
+STATE = struct.Struct('<ddd') # x, y, health of an entity
+
+
+"""
+Class KeyState(): The keys in KEYS that are held down, as a bit mask. Indexed like pygame.key.get_pressed().
+"""
+class KeyState:
+    def __init__(self, mask=0):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        return (index := KEY_INDEX.get(key, None)) is not None and bool(self.mask >> index & 1)
+
+
+"""
+Class Controls(): The input of a single update: the keys held down, the mouse buttons held down and the position of the
+mouse. Everything that an update reads from the keyboard and mouse is read from here (see Game.controls), so that
+an update can be fed recorded input.
+"""
+class Controls:
+    def __init__(self, keys=0, buttons=0, position=(0, 0)):
+        self.keys = KeyState(keys)
+        self.buttons = tuple(bool(buttons >> n & 1) for n in range(3)) # Indexed like pygame.mouse.get_pressed()
+        self.position = position
+
+    """
+    Method poll(): Returns the current input of the keyboard and mouse.
+    """
+    @classmethod
+    def poll(cls):
+        pressed = pygame.key.get_pressed()
+        buttons = pygame.mouse.get_pressed()
+
+        return cls(sum(1 << n for n, key in enumerate(KEYS) if pressed[key]),
+                   sum(1 << n for n in range(3) if buttons[n]),
+                   tuple(pygame.mouse.get_pos()))
+
+    def pack(self):
+        return TICK.pack(self.keys.mask, sum(1 << n for n in range(3) if self.buttons[n]), *self.position)
+
+
+"""
+Function checksum(): Returns a checksum (CRC-32) of the state of the level: the position and health of every entity,
+the particles, the projectiles and the camera. Two runs that did the same work have the same checksums.
+"""
+def checksum(game):
+    level = game.LEVEL_INFO
+    crc = 0
+
+    for entity in level.entities.retrieve_entities():
+        crc = zlib.crc32(STATE.pack(entity.x, entity.y, getattr(entity, 'health', 0)), crc)
+
+    crc = zlib.crc32(level.particles.current_position[:level.particles.count].tobytes(), crc)
+    crc = zlib.crc32(level.projectiles.position[:level.projectiles.count].tobytes(), crc)
+
+    return zlib.crc32(struct.pack('<dd', *game.offset), crc)
+
+
+# Clears what is left over from an earlier level (or run), which a replay could not know about
+def reset(game):
+    game.screen_shake = 0
+    game.hurt = 0
+    game.button_cooldown = True
+
+
+"""
+Class Recorder(): Records the input of every update of a level into a file in 'directory', one file per level loaded.
+Randomness (random module) is seeded at the start of the level and again before every update, from a seed kept in the
+file, so that a replay (see Replayer) draws the same numbers no matter how often frames were drawn in between.
+"""
+class Recorder:
+    def __init__(self, directory='recordings', interval=60):
+        self.directory = directory
+        self.interval = interval # Updates between checksums
+
+        self.file = None
+        self.path = None
+        self.seed = 0
+        self.ticks = 0
+
+    """
+    Method begin(): Starts recording a new file for the level of 'game' (called when the level is loaded, before its
+    entities are made).
+    """
+    def begin(self, game):
+        self.end()
+        reset(game)
+        level = game.LEVEL_INFO.current_level
+
+        self.seed = random.randrange(2**32)
+        self.ticks = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f'level-{level}-{time.strftime("%Y%m%d-%H%M%S")}.btsr')
+        self.file = gzip.open(self.path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, level, self.seed, self.interval))
+
+        random.seed(self.seed)
+
+    """
+    Method tick(): Returns the input for the next update of 'game', and records it.
+    """
+    def tick(self, game):
+        if self.file and self.ticks % self.interval == 0:
+            self.file.write(CHECK.pack(checksum(game)))
+
+        controls = Controls.poll()
+        if self.file:
+            self.file.write(controls.pack())
+
+        random.seed(self.seed + self.ticks) # Every update draws from its own sequence
+        self.ticks += 1
+
+        return controls
+
+    def end(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+"""
+Class Replayer(): Feeds the input of a recording (see Recorder) to the updates of a level, and seeds randomness the
+same way, so the level does exactly what it did when it was recorded. The checksums of the recording are compared to
+the state of the level along the way; 'mismatch' is the first update where they differ (None if they never did).
+"""
+class Replayer:
+    def __init__(self, path):
+        with gzip.open(path, 'rb') as file:
+            data = file.read()
+
+        magic, version, self.level, self.seed, self.interval = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a recording of version {VERSION}')
+
+        # Splits the updates and the checksums
+        self.controls = []
+        self.checksums = {}
+        offset = HEADER.size
+        while offset + TICK.size <= len(data):
+            if len(self.controls) % self.interval == 0:
+                self.checksums[len(self.controls)] = CHECK.unpack_from(data, offset)[0]
+                offset += CHECK.size
+                if offset + TICK.size > len(data):
+                    break
+
+            keys, buttons, x, y = TICK.unpack_from(data, offset)
+            self.controls.append(Controls(keys, buttons, (x, y)))
+            offset += TICK.size
+
+        self.ticks = 0
+        self.checked = 0 # Checksums compared so far
+        self.mismatch = None
+
+    def begin(self, game):
+        reset(game)
+        self.ticks = 0
+        random.seed(self.seed)
+
+    """
+    Method tick(): Returns the recorded input for the next update of 'game', or None when the recording has ended.
+    """
+    def tick(self, game):
+        if self.ticks >= len(self.controls):
+            return None
+
+        if (expected := self.checksums.get(self.ticks, None)) is not None:
+            self.checked += 1
+            if checksum(game) != expected and self.mismatch is None:
+                self.mismatch = self.ticks
+
+        controls = self.controls[self.ticks]
+
+        random.seed(self.seed + self.ticks)
+        self.ticks += 1
+
+        return controls
+
+    def end(self):
+        pass
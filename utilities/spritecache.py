@@ -0,0 +1,177 @@
+# Standard
+import os
+import mmap
+import struct
+import hashlib
+
+# 3rd party
+import pygame
+
+"""
+Class SpriteCache(): Keeps the finished frames of images (cut out of spritesheets, scaled, flipped, ...) on disk as raw
+pixels, so that the next start does not have to decode, cut or scale anything. A cached image is memory-mapped and
+each frame becomes a Surface that uses the mapped pixels directly (pygame.image.frombuffer).
+
+A cache file is named after the source image and everything that changes its frames (see frames()), followed by the
+size and modification time of the source; when the source changes, the old file no longer matches and is replaced.
+
+File layout (little-endian): magic, version, number of frames; per frame its width, height and colour key (if any);
+then the pixels of every frame in BGRA order, which is the pixel format of surfaces made by convert_alpha().
+"""
+class SpriteCache:
+    shared_cache = None
+
+    MAGIC = b'BTSS'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHI') # magic, version, frames
+    FRAME = struct.Struct('<IIB3B') # width, height, has colour key, colour key
+
+    def __init__(self, directory='cache/sprites'):
+        self.directory = directory
+        self.masks = None # Pixel masks of convert_alpha(), which the cached pixels are stored in
+
+    """
+    Method shared(): Returns the sprite cache used by the whole game.
+    """
+    @classmethod
+    def shared(cls):
+        if not cls.shared_cache:
+            cls.shared_cache = cls()
+
+        return cls.shared_cache
+
+    """
+    Method frames(): Returns the frames made from the image at 'path'. 'variant' is anything that changes the frames
+    (e.g. frame size and scale, as a tuple of simple values), and 'build' is a function that makes the frames (as a list
+    of surfaces) from the image when they are not cached yet.
+    """
+    def frames(self, path, variant, build):
+        if not (file_path := self.file_path(path, variant)):
+            return build() # Let the loader report the missing image
+
+        if os.path.exists(file_path):
+            try:
+                return self.read(file_path)
+            except (OSError, ValueError, struct.error):
+                pass
+
+        frames = build()
+        self.write(file_path, frames)
+
+        return frames
+
+    """
+    Method sheet(): Like frames(), but returns the frames as a CachedFrames, which only makes a frame into a Surface
+    when it is used (e.g. the pieces of a large image, see ImageChunks). Without a usable cache file, it returns the
+    list of built frames instead.
+    """
+    def sheet(self, path, variant, build):
+        if not (file_path := self.file_path(path, variant)):
+            return build()
+
+        frames = None
+        if not os.path.exists(file_path):
+            frames = build()
+            self.write(file_path, frames)
+
+        try:
+            return CachedFrames(self, file_path)
+        except (OSError, ValueError, struct.error):
+            return frames if frames is not None else build()
+
+    """
+    Method contains(): Returns whether the frames made from the image at 'path' for 'variant' are cached (and up to date).
+    """
+    def contains(self, path, variant):
+        return (file_path := self.file_path(path, variant)) is not None and os.path.exists(file_path)
+
+    # Path of the cache file for an image and variant, or None if there is no such image
+    def file_path(self, path, variant):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        name = hashlib.sha1(repr((path, variant)).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{name}-{stat.st_size}-{stat.st_mtime_ns}.bin')
+
+    def read(self, file_path):
+        frames = CachedFrames(self, file_path)
+        return [frames[n] for n in range(len(frames))]
+
+    def write(self, file_path, frames):
+        name = os.path.basename(file_path).partition('-')[0]
+        header = [self.HEADER.pack(self.MAGIC, self.VERSION, len(frames))]
+        pixels = []
+
+        for frame in frames:
+            colour = frame.get_colorkey()
+            header.append(self.FRAME.pack(*frame.get_size(), colour is not None, *(colour[:3] if colour else (0, 0, 0))))
+            pixels.append(pygame.image.tobytes(frame, 'BGRA'))
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            # Removes the files of earlier versions of the same source
+            for old in os.listdir(self.directory):
+                if old.startswith(name + '-'):
+                    os.remove(os.path.join(self.directory, old))
+
+            # Written under another name first, so that a half written file is never read
+            with open(file_path + '.tmp', 'wb') as file:
+                file.write(b''.join(header + pixels))
+            os.replace(file_path + '.tmp', file_path)
+        except OSError:
+            pass # The cache is only an optimisation; the frames are made again at the next start
+
+    def display_masks(self):
+        if not self.masks:
+            self.masks = pygame.Surface((1, 1)).convert_alpha().get_masks()
+
+        return self.masks
+
+
+"""
+Class CachedFrames(): The frames of one sprite cache file, which is memory-mapped and read from as frames are used:
+indexing makes one frame into a Surface, so the pixels of the other frames are never touched.
+"""
+class CachedFrames:
+    def __init__(self, cache, file_path):
+        self.cache = cache
+
+        with open(file_path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        magic, version, count = cache.HEADER.unpack_from(buffer)
+        if magic != cache.MAGIC or version != cache.VERSION:
+            raise ValueError(f'{file_path} is not a sprite cache file of version {cache.VERSION}')
+
+        self.view = memoryview(buffer)
+
+        # Width, height, colour key (or None) and pixel offset of every frame
+        self.layout = []
+        offset = cache.HEADER.size + count * cache.FRAME.size
+
+        for n in range(count):
+            w, h, keyed, *colour = cache.FRAME.unpack_from(buffer, cache.HEADER.size + n * cache.FRAME.size)
+            self.layout.append((w, h, colour if keyed else None, offset))
+            offset += w * h * 4
+
+        if offset > len(buffer):
+            raise ValueError(f'{file_path} is truncated')
+
+    def __len__(self):
+        return len(self.layout)
+
+    def __getitem__(self, n):
+        w, h, colour, offset = self.layout[n]
+        frame = pygame.image.frombuffer(self.view[offset : offset + w * h * 4], (w, h), 'BGRA')
+
+        # Only where the display uses another pixel format are the frames converted (and so copied)
+        if frame.get_masks() != self.cache.display_masks():
+            frame = frame.convert_alpha()
+
+        if colour:
+            frame.set_colorkey(colour)
+
+        return frame
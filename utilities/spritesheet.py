@@ -1,15 +1,16 @@
 import pygame
 
 class Spritesheet:
-    def __init__(self, spritesheet, frame_size):
+    def __init__(self, spritesheet, frame_size, frames=None):
         self.spritesheet = spritesheet
         self.frame_size = frame_size
+        self.frames = frames if frames else spritesheet.get_width() // frame_size[0] # Number of frames, if known beforehand (see Manifest.frames)
 
     def divide_spritesheet(self, colour):
         divided_spritesheet = []
         regular, flipped = [], []
 
-        for frame_number in range(self.spritesheet.get_width() // self.frame_size[0]):
+        for frame_number in range(self.frames):
             image = pygame.Surface(self.frame_size).convert_alpha()
             image.fill(colour)
             image.blit(self.spritesheet, (0,0), ((frame_number * self.frame_size[0]), 0, *self.frame_size))
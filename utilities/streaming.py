@@ -0,0 +1,115 @@
+# Standard
+from queue import Queue
+from threading import Thread
+
+"""
+Class WorldStream(): Keeps only the part of a level around the camera loaded, so that large levels cost about as
+much as small ones. The level is split into the same chunks as its TileChunks surfaces:
+
+- chunks within 'view_distance' chunks of the view are active: their surfaces are drawn ahead of time by a background
+  thread (before they scroll into view), and their entities are updated.
+- entities are only created once their chunk first becomes active, and entities in chunks that are not active are
+  suspended (taken out of the EntityManager, and put back unchanged when their chunk is active again).
+- chunk surfaces further than 'keep_distance' chunks from the view are dropped, and drawn again when needed.
+
+The chunks of other layers of the level (e.g. its background and foreground images, see ImageChunks) are prefetched
+and dropped along with the tiles.
+
+The background thread can also run other slow, one-off jobs of the level (see load()).
+"""
+class WorldStream:
+    def __init__(self, chunks, spawn, view_distance=1, keep_distance=2, layers=()):
+        self.chunks = chunks
+        self.spawn = spawn # Function that creates an entity from its position and entity id
+        self.layers = [chunks, *layers] # Everything with chunk surfaces to prefetch and drop (the tiles first)
+
+        self.VIEW_DISTANCE = view_distance
+        self.KEEP_DISTANCE = keep_distance
+
+        self.active = set() # (chunk column, chunk row) of the active chunks
+        self.spawns = {} # Chunk -> entities that have not been created yet, as (position, entity id)
+        self.suspended = {} # Chunk -> entities that are not updated while the chunk is not active
+
+        self.jobs = Queue()
+        self.worker = Thread(target=self.work, daemon=True)
+        self.worker.start()
+
+    def work(self):
+        while (job := self.jobs.get()) is not None:
+            job()
+
+    """
+    Method load(): Runs 'job' (a function without arguments) on the background thread.
+    """
+    def load(self, job):
+        self.jobs.put(job)
+
+    """
+    Method stop(): Ends the background thread once the jobs before it are done (e.g. when another level is loaded).
+    """
+    def stop(self):
+        self.jobs.put(None)
+
+    # Chunk that a position lies in
+    def chunk_of(self, x, y):
+        grid = self.chunks.grid
+        return (int((x - grid.x) // self.chunks.w), int((y - grid.y) // self.chunks.h))
+
+    # Chunk of the level nearest to a position, clamped like the chunks of around() (which are the only ones ever
+    # active), so that an entity outside the level (e.g. knocked past its edge) is still restored with its nearest chunk
+    def nearest_chunk(self, x, y):
+        column, row = self.chunk_of(x, y)
+        last_column, last_row = self.chunks.last_chunk()
+
+        return min(max(column, 0), last_column), min(max(row, 0), last_row)
+
+    # Chunks of the level within 'distance' chunks of 'rect'
+    def around(self, rect, distance):
+        c0, r0 = self.chunk_of(rect.x, rect.y)
+        c1, r1 = self.chunk_of(rect.x + rect.w, rect.y + rect.h)
+
+        last_column, last_row = self.chunks.last_chunk()
+
+        return {(column, row) for row in range(max(r0 - distance, 0), min(r1 + distance, last_row) + 1)
+                              for column in range(max(c0 - distance, 0), min(c1 + distance, last_column) + 1)}
+
+    """
+    Method add_spawn(): Adds an entity to be created once the chunk at 'position' becomes active.
+    """
+    def add_spawn(self, position, id):
+        self.spawns.setdefault(self.nearest_chunk(*position), []).append((position, id))
+
+    """
+    Method update(): Activates the chunks around 'view' (the area seen by the camera) and suspends the ones that left
+    it, adding and removing the entities of the EntityManager 'manager' to match. The player of the manager is never
+    suspended.
+    """
+    def update(self, view, manager):
+        wanted = self.around(view, self.VIEW_DISTANCE)
+        entered = wanted - self.active
+        self.active = wanted
+
+        for key in entered:
+            self.load(lambda key=key: self.prefetch(key))
+
+            for position, id in self.spawns.pop(key, ()):
+                manager.add(self.spawn(position, id))
+            manager.add_multiple(self.suspended.pop(key, ()))
+
+        # Each pool is walked from its end, as a removed entity is replaced by the last one (which has been seen already)
+        for pool in manager.pools.values():
+            for slot in range(len(pool) - 1, -1, -1):
+                entity = pool[slot]
+                if entity.handle != manager.player and (key := self.nearest_chunk(entity.x, entity.y)) not in wanted:
+                    self.suspended.setdefault(key, []).append(entity)
+                    manager.remove(entity)
+
+        keep = self.around(view, self.KEEP_DISTANCE)
+        for layer in self.layers:
+            layer.evict(keep)
+
+    # Draws the surfaces of a chunk ahead of time (on the background thread), unless it has gone out of range since
+    def prefetch(self, key):
+        for layer in self.layers:
+            if key in self.active:
+                layer.bake_key(key)
@@ -0,0 +1,132 @@
+# Standard
+from threading import Lock
+from collections import OrderedDict
+
+# 3rd party
+import pygame
+
+"""
+Function surface_bytes(): Returns how many bytes of pixels a value holds: a Surface, or lists, tuples and dictionaries
+of them (e.g. the frames of an animation).
+"""
+def surface_bytes(value):
+    if isinstance(value, pygame.Surface):
+        return value.get_pitch() * value.get_height() # A row of pixels, padded to its pitch, times the rows
+
+    if isinstance(value, dict):
+        value = value.values()
+    if isinstance(value, (list, tuple, type({}.values()))):
+        return sum(surface_bytes(item) for item in value)
+
+    return 0
+
+
+"""
+Class SurfaceCache(): Keeps loaded surfaces (and groups of them) by key, up to a budget of bytes. When the budget is
+exceeded, the least recently used entries are dropped first, except for the pinned ones (e.g. the assets of the level
+being played), which stay until they are unpinned.
+
+Keeps count of hits (found), misses (not found) and evictions (dropped to stay within the budget), see stats().
+"""
+class SurfaceCache:
+    shared_cache = None
+    BUDGET = 128 * 1024 * 1024 # Bytes
+
+    def __init__(self, budget=BUDGET):
+        self.budget = budget
+        self.used = 0
+
+        self.entries = OrderedDict() # Key -> (value, bytes), least recently used first
+        self.pins = {} # Key -> number of times it is pinned
+        self.lock = Lock() # Assets are loaded from more than one thread
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    """
+    Method shared(): Returns the surface cache used by the whole game.
+    """
+    @classmethod
+    def shared(cls):
+        if not cls.shared_cache:
+            cls.shared_cache = cls()
+
+        return cls.shared_cache
+
+    """
+    Method get(): Returns the value of 'key' (and marks it as recently used), or 'default' if it is not cached.
+    """
+    def get(self, key, default=None):
+        with self.lock:
+            if (entry := self.entries.get(key, None)) is None:
+                self.misses += 1
+                return default
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[0]
+
+    """
+    Method put(): Caches 'value' under 'key', and drops other entries if the budget is exceeded.
+    """
+    def put(self, key, value):
+        size = surface_bytes(value)
+
+        with self.lock:
+            if (entry := self.entries.pop(key, None)) is not None:
+                self.used -= entry[1]
+
+            self.entries[key] = (value, size)
+            self.used += size
+
+            self.evict()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    """
+    Method pin(): Keeps the entries of 'keys' from being dropped until they are unpinned as many times.
+    """
+    def pin(self, keys):
+        with self.lock:
+            for key in keys:
+                self.pins[key] = self.pins.get(key, 0) + 1
+
+    def unpin(self, keys):
+        with self.lock:
+            for key in keys:
+                if (count := self.pins.get(key, 0)) > 1:
+                    self.pins[key] = count - 1
+                else:
+                    self.pins.pop(key, None)
+
+            self.evict()
+
+    # Drops the least recently used entries that are not pinned, until the budget is met
+    def evict(self):
+        if self.used <= self.budget:
+            return
+
+        for key in [key for key in self.entries if key not in self.pins]:
+            _, size = self.entries.pop(key)
+            self.used -= size
+            self.evictions += 1
+
+            if self.used <= self.budget:
+                break
+
+    """
+    Method stats(): Returns the counters and the size of the cache, as a dictionary.
+    """
+    def stats(self):
+        return {
+            'entries' : len(self.entries),
+            'pinned' : len(self.pins),
+            'bytes' : self.used,
+            'budget' : self.budget,
+            'hits' : self.hits,
+            'misses' : self.misses,
+            'evictions' : self.evictions,
+        }